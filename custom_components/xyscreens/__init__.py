@@ -4,16 +4,27 @@ import asyncio
 import logging
 import os
 import socket
+import time
+from collections.abc import Mapping
+from types import MappingProxyType
 from typing import Any
 
-import serial
-import serial_asyncio_fast as serial_asyncio
-from homeassistant.config_entries import ConfigEntry
+from homeassistant.config_entries import ConfigEntry, ConfigSubentry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers import entity_registry
-
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry, entity_registry
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.typing import ConfigType
+from homeassistant.util import slugify
+
+from .bus import (
+    async_acquire_bus,
+    async_release_bus,
+    get_connection_string,
+    open_serial_port,
+)
 from .const import (
     CONF_ADDRESS,
     CONF_CONNECTION_TYPE,
@@ -23,36 +34,52 @@ from .const import (
     CONF_DEVICE_TYPE_PROJECTOR_SCREEN,
     CONF_HOST,
     CONF_INVERTED,
+    CONF_MULTIPLEXER_PORT,
     CONF_PORT,
+    CONF_RECORD,
     CONF_SERIAL_PORT,
     CONF_TIME_CLOSE,
     CONF_TIME_OPEN,
+    DATA_BUSES,
+    DATA_MOTION,
+    DATA_MULTIPLEXERS,
+    DATA_POSITIONS,
+    DATA_RECORDERS,
     DOMAIN,
+    SIGNAL_DEVICES_UPDATED,
+    SUBENTRY_TYPE_DEVICE,
 )
+from .motion import XYScreensMotionScheduler
+from .multiplexer import XYScreensMultiplexer
+from .recorder import XYScreensRecorder
+from .services import async_setup_services
+from .store import XYScreensPositionStore
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS: list[Platform] = [Platform.COVER]
+PLATFORMS: list[Platform] = [Platform.COVER, Platform.SENSOR]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+def _test_serial_port(serial_port: str) -> None:
+    """Open and close the serial port, blocking."""
+    open_serial_port(serial_port).close()
 
 
 async def test_serial_port(serial_port):
     """Test the working of a serial port."""
+    start = time.monotonic()
 
-    # Create the connection instance.
-    _, writer = await serial_asyncio.open_serial_connection(
-        url=serial_port,
-        baudrate=2400,
-        bytesize=serial.EIGHTBITS,
-        parity=serial.PARITY_NONE,
-        stopbits=serial.STOPBITS_ONE,
-        timeout=1,
+    # Opening, configuring and closing the serial port blocks, do it in the executor.
+    await asyncio.get_running_loop().run_in_executor(
+        None, _test_serial_port, serial_port
     )
 
-    # Close the connection.
-    writer.close()
-    await writer.wait_closed()
-
-    _LOGGER.debug("Device %s is available", serial_port)
+    _LOGGER.debug(
+        "Device %s is available, test took %.1f ms",
+        serial_port,
+        (time.monotonic() - start) * 1000,
+    )
 
 
 async def test_tcp_connection(host: str, port: int):
@@ -69,47 +96,78 @@ async def test_tcp_connection(host: str, port: int):
 
         _LOGGER.debug("TCP connection to %s:%d is available", host, port)
 
-    except (asyncio.TimeoutError, OSError, ConnectionError) as ex:
+    except (asyncio.TimeoutError, OSError, ConnectionError, ValueError) as ex:
         _LOGGER.error("Failed to connect to %s:%d: %s", host, port, ex)
         raise
 
 
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up XY Screens from a config entry."""
-    await entity_registry.async_migrate_entries(
-        hass, entry.entry_id, async_migrate_entity_entry
-    )
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the XY Screens integration."""
+    # One scheduler tracks the moves of all devices.
+    hass.data.setdefault(DOMAIN, {})[DATA_MOTION] = XYScreensMotionScheduler()
 
-    # Get connection type (default to serial for backward compatibility)
-    connection_type = entry.data.get(CONF_CONNECTION_TYPE, CONF_CONNECTION_TYPE_SERIAL)
+    # The positions of all devices are read at once, before the covers are set up.
+    store = XYScreensPositionStore(hass)
+    await store.async_load()
+    hass.data[DOMAIN][DATA_POSITIONS] = store
 
-    # Test connection based on type
-    if connection_type == CONF_CONNECTION_TYPE_SERIAL:
-        # Test serial connection
-        serial_port = entry.data[CONF_SERIAL_PORT]
-        if not os.path.exists(serial_port):
-            raise ConfigEntryNotReady(f"Device {serial_port} does not exist")
+    async_setup_services(hass)
 
-        try:
-            await test_serial_port(serial_port)
-        except serial.SerialException as ex:
-            raise ConfigEntryNotReady(
-                f"Unable to connect to device {serial_port}: {ex}"
-            ) from ex
+    return True
 
-    elif connection_type == CONF_CONNECTION_TYPE_NETWORK:
-        # Test network connection
-        host = entry.data[CONF_HOST]
-        port = entry.data[CONF_PORT]
 
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Set up the XY Screens devices on a bus from a config entry."""
+    # All devices on the serial port or TCP endpoint share one connection.
+    bus = await async_acquire_bus(hass, entry)
+
+    # A network bus keeps a persistent connection that is restored in the background, a
+    # converter that is briefly unreachable doesn't keep the entry from being set up. A serial
+    # port is opened right away, the entry is retried later if that fails.
+    if (
+        entry.data.get(CONF_CONNECTION_TYPE, CONF_CONNECTION_TYPE_SERIAL)
+        == CONF_CONNECTION_TYPE_SERIAL
+    ):
         try:
-            await test_tcp_connection(host, port)
-        except Exception as ex:
+            await bus.async_open()
+        # A SerialException is an OSError.
+        except OSError as ex:
+            await async_release_bus(hass, entry)
             raise ConfigEntryNotReady(
-                f"Unable to connect to {host}:{port}: {ex}"
+                f"Unable to connect to device {bus.connection_string}: {ex}"
             ) from ex
 
-    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = entry.data
+    # The connection data and bus options the entry is set up with, a change requires a reload.
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = (entry.data, entry.options)
+
+    if entry.options.get(CONF_RECORD):
+        recorder = XYScreensRecorder(
+            hass.config.path(f"xyscreens_{slugify(bus.connection_string)}.rec")
+        )
+        try:
+            await recorder.async_start(hass)
+        except OSError as ex:
+            _LOGGER.error("Unable to record to %s: %s", recorder.path, ex)
+        else:
+            bus.recorder = recorder
+            hass.data[DOMAIN].setdefault(DATA_RECORDERS, {})[entry.entry_id] = recorder
+
+    if multiplexer_port := entry.options.get(CONF_MULTIPLEXER_PORT):
+        multiplexer = XYScreensMultiplexer(bus, int(multiplexer_port))
+        try:
+            await multiplexer.async_start()
+        except OSError as ex:
+            # The devices can still be controlled, only other tools can't share the bus.
+            _LOGGER.error(
+                "Unable to share bus %s on port %d: %s",
+                bus.connection_string,
+                multiplexer_port,
+                ex,
+            )
+        else:
+            hass.data[DOMAIN].setdefault(DATA_MULTIPLEXERS, {})[
+                entry.entry_id
+            ] = multiplexer
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
@@ -120,23 +178,49 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    # It should not be necessary to close the serial port because we close
-    # it after every use in cover.py, i.e. no need to do entry["client"].close()
-
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         hass.data[DOMAIN].pop(entry.entry_id)
 
+        # Stop taking frames from other tools before the bus is released.
+        multiplexers = hass.data[DOMAIN].get(DATA_MULTIPLEXERS, {})
+        if (multiplexer := multiplexers.pop(entry.entry_id, None)) is not None:
+            await multiplexer.async_stop()
+
+        recorders = hass.data[DOMAIN].get(DATA_RECORDERS, {})
+        if (recorder := recorders.pop(entry.entry_id, None)) is not None:
+            bus = hass.data[DOMAIN][DATA_BUSES].get(get_connection_string(entry.data))
+            if bus is not None:
+                bus.recorder = None
+            await recorder.async_stop(hass)
+
+        # The connection is closed when the last entry on the bus is unloaded.
+        await async_release_bus(hass, entry)
+
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the positions of the devices of a removed entry."""
+    hass.data[DOMAIN][DATA_POSITIONS].async_remove(entry.subentries)
+
+
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Handle options update."""
-    hass.config_entries.async_schedule_reload(entry.entry_id)
+    """
+    Handle updates of the entry and its devices.
+
+    Only a change of the connection or the bus options reloads the entry. Added and changed
+    devices are applied to the running covers, keeping their position and any move in progress.
+    """
+    if (entry.data, entry.options) != hass.data[DOMAIN][entry.entry_id]:
+        hass.config_entries.async_schedule_reload(entry.entry_id)
+        return
+
+    async_dispatcher_send(hass, SIGNAL_DEVICES_UPDATED.format(entry.entry_id))
 
 
 async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
     """Migrate old entry."""
-    if config_entry.version > 3:
+    if config_entry.version > 4:
         # This means the user has downgraded from a future version
         return False
 
@@ -155,21 +239,20 @@ async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
             config_entry, title=new_title, data=new_data, options=new_options, version=2
         )
 
-    if config_entry.version == 2:
-        if config_entry.minor_version < 2:
-            _LOGGER.debug("Migrating config entry from 2.1 to 2.2")
-            new_unique_id = f"{config_entry.data.get(CONF_SERIAL_PORT)}-aaeeee"
-            new_title = f"{config_entry.data.get(CONF_SERIAL_PORT)} AAEEEE"
-            new_data = {
-                CONF_SERIAL_PORT: config_entry.data.get(CONF_SERIAL_PORT),
-                CONF_ADDRESS: "aaeeee",
-                CONF_DEVICE_TYPE: CONF_DEVICE_TYPE_PROJECTOR_SCREEN,
-            }
-            new_options = {
-                CONF_TIME_OPEN: config_entry.options.get(CONF_TIME_OPEN),
-                CONF_TIME_CLOSE: config_entry.options.get(CONF_TIME_CLOSE),
-                CONF_INVERTED: config_entry.options.get(CONF_INVERTED, False),
-            }
+    if config_entry.version == 2 and config_entry.minor_version < 2:
+        _LOGGER.debug("Migrating config entry from 2.1 to 2.2")
+        new_unique_id = f"{config_entry.data.get(CONF_SERIAL_PORT)}-aaeeee"
+        new_title = f"{config_entry.data.get(CONF_SERIAL_PORT)} AAEEEE"
+        new_data = {
+            CONF_SERIAL_PORT: config_entry.data.get(CONF_SERIAL_PORT),
+            CONF_ADDRESS: "aaeeee",
+            CONF_DEVICE_TYPE: CONF_DEVICE_TYPE_PROJECTOR_SCREEN,
+        }
+        new_options = {
+            CONF_TIME_OPEN: config_entry.options.get(CONF_TIME_OPEN),
+            CONF_TIME_CLOSE: config_entry.options.get(CONF_TIME_CLOSE),
+            CONF_INVERTED: config_entry.options.get(CONF_INVERTED, False),
+        }
 
         hass.config_entries.async_update_entry(
             config_entry,
@@ -188,6 +271,10 @@ async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
             version=2,
         )
 
+    if config_entry.version == 2:
+        _LOGGER.debug("Migrating config entry from 2.2 to 4.1")
+        _async_migrate_to_bus_entry(hass, config_entry)
+
     _LOGGER.debug(
         "Migration to configuration version %s.%s successful",
         config_entry.version,
@@ -198,15 +285,101 @@ async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
 
 
 @callback
-def async_migrate_entity_entry(
-    entry: entity_registry.RegistryEntry,
-) -> dict[str, Any] | None:
+def _async_migrate_to_bus_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
     """
-    Migrates old unique ID to the new unique ID.
+    Migrate an entry of a single device to a device subentry of the entry of its bus.
+
+    The first entry on a bus that is migrated becomes the entry of the bus. The devices of the
+    other entries on the same bus are moved to it, after which these entries are removed.
     """
-    if entry.unique_id != entry.config_entry_id:
-        _LOGGER.debug("Migrating entity unique id")
-        return {"new_unique_id": entry.config_entry_id}
+    connection_string = get_connection_string(config_entry.data)
+    address = config_entry.data.get(CONF_ADDRESS, "aaeeee")
+
+    bus_data = {
+        key: value
+        for key, value in config_entry.data.items()
+        if key not in (CONF_ADDRESS, CONF_DEVICE_TYPE)
+    }
+    subentry = ConfigSubentry(
+        data=MappingProxyType(
+            {
+                CONF_ADDRESS: address,
+                CONF_DEVICE_TYPE: config_entry.data.get(
+                    CONF_DEVICE_TYPE, CONF_DEVICE_TYPE_PROJECTOR_SCREEN
+                ),
+                **config_entry.options,
+            }
+        ),
+        subentry_type=SUBENTRY_TYPE_DEVICE,
+        title=address.upper(),
+        unique_id=address,
+    )
 
-    # No migration needed
-    return None
+    bus_entry = next(
+        (
+            entry
+            for entry in hass.config_entries.async_entries(DOMAIN)
+            if entry.version == 4 and entry.unique_id == connection_string
+        ),
+        None,
+    )
+
+    if bus_entry is None:
+        hass.config_entries.async_update_entry(
+            config_entry,
+            unique_id=connection_string,
+            title=connection_string,
+            data=bus_data,
+            options={},
+            minor_version=1,
+            version=4,
+        )
+        bus_entry = config_entry
+    else:
+        # The entry ends up without devices and is removed once its setup is done.
+        hass.config_entries.async_update_entry(
+            config_entry, data=bus_data, options={}, minor_version=1, version=4
+        )
+        hass.async_create_task(hass.config_entries.async_remove(config_entry.entry_id))
+
+    if any(
+        existing.unique_id == address for existing in bus_entry.subentries.values()
+    ):
+        _LOGGER.warning(
+            "Device %s is configured more than once on %s",
+            address.upper(),
+            connection_string,
+        )
+        return
+
+    hass.config_entries.async_add_subentry(bus_entry, subentry)
+
+    # Keep the device and entity, with their names, areas and history. The entity is moved
+    # first and the device is added to the subentry before it is removed from the old entry,
+    # else they would be deleted.
+    ent_reg = entity_registry.async_get(hass)
+    for entity in entity_registry.async_entries_for_config_entry(
+        ent_reg, config_entry.entry_id
+    ):
+        ent_reg.async_update_entity(
+            entity.entity_id,
+            config_entry_id=bus_entry.entry_id,
+            config_subentry_id=subentry.subentry_id,
+            new_unique_id=subentry.subentry_id,
+        )
+
+    dev_reg = device_registry.async_get(hass)
+    for device in device_registry.async_entries_for_config_entry(
+        dev_reg, config_entry.entry_id
+    ):
+        dev_reg.async_update_device(
+            device.id,
+            add_config_entry_id=bus_entry.entry_id,
+            add_config_subentry_id=subentry.subentry_id,
+            new_identifiers={(DOMAIN, subentry.subentry_id)},
+        )
+        dev_reg.async_update_device(
+            device.id,
+            remove_config_entry_id=config_entry.entry_id,
+            remove_config_subentry_id=None,
+        )
@@ -0,0 +1,694 @@
+"""Shared RS-485 bus connections for the XY Screens integration."""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import collections
+import logging
+import random
+import socket
+import time
+from collections.abc import Callable, Mapping
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import (
+    CONF_CONNECTION_TYPE,
+    CONF_CONNECTION_TYPE_NETWORK,
+    CONF_CONNECTION_TYPE_SERIAL,
+    CONF_HOST,
+    CONF_LISTEN,
+    CONF_PORT,
+    CONF_SERIAL_PORT,
+    DATA_BUSES,
+    DOMAIN,
+)
+from .frames import FRAME_LENGTH, XYScreensFrameParser
+from .recorder import DIRECTION_RECEIVED, DIRECTION_SENT
+
+if TYPE_CHECKING:
+    import serial
+
+    from .recorder import XYScreensRecorder
+
+_LOGGER = logging.getLogger(__name__)
+
+# The devices communicate at 2400 baud 8N1, one start bit, eight data bits and one stop bit.
+BAUD_RATE = 2400
+BITS_PER_BYTE = 10
+
+# The maximum number of device addresses with a command waiting to be sent.
+COMMAND_QUEUE_SIZE = 32
+
+# Seconds a command is held while the connection is being restored, before it is dropped.
+COMMAND_EXPIRY = 5.0
+
+# Smoothing factor of the exponentially weighted moving average of the write latency.
+LATENCY_SMOOTHING = 0.2
+
+# Upper bounds in seconds of the write latency histogram buckets, the last bucket counts
+# everything slower. A single frame takes about 21 ms on the wire.
+LATENCY_BUCKETS = (0.025, 0.035, 0.05, 0.075, 0.1, 0.15, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Seconds after a frame has left the wire in which it can be received back as an echo.
+ECHO_TIMEOUT = 1.0
+
+# Seconds to wait for a TCP connection to be established.
+CONNECT_TIMEOUT = 5.0
+
+# Delay in seconds before the first reconnect attempt, doubled after every failed attempt up to
+# the maximum.
+RECONNECT_MIN_DELAY = 1.0
+RECONNECT_MAX_DELAY = 60.0
+
+# TCP keepalive settings, a dead converter is detected after about 20 seconds of silence.
+KEEPALIVE_IDLE = 10
+KEEPALIVE_INTERVAL = 5
+KEEPALIVE_COUNT = 2
+
+
+def transmit_time(frame: bytes) -> float:
+    """Return the time in seconds the frame takes on the wire."""
+    return len(frame) * BITS_PER_BYTE / BAUD_RATE
+
+
+def open_serial_port(serial_port: str) -> serial.Serial:
+    """
+    Open and configure the serial port.
+
+    The serial stack is only imported when a serial bus is used, network-only installations
+    don't need it. This does blocking I/O and should be run in the executor.
+    """
+    # pylint: disable=import-outside-toplevel
+    import serial
+
+    return serial.serial_for_url(
+        serial_port,
+        baudrate=BAUD_RATE,
+        bytesize=serial.EIGHTBITS,
+        parity=serial.PARITY_NONE,
+        stopbits=serial.STOPBITS_ONE,
+        timeout=1,
+    )
+
+
+def get_connection_string(data: Mapping[str, Any]) -> str:
+    """Return the serial port path or host:port string for the given entry data."""
+    connection_type = data.get(CONF_CONNECTION_TYPE, CONF_CONNECTION_TYPE_SERIAL)
+
+    if connection_type == CONF_CONNECTION_TYPE_NETWORK:
+        # Network connection: build host:port string
+        return f"{data.get(CONF_HOST)}:{int(data.get(CONF_PORT))}"  # Convert float to int
+
+    # Serial connection: use serial port path
+    return data.get(CONF_SERIAL_PORT)
+
+
+class XYScreensBus:
+    """
+    A long-lived connection to a serial port or RS-485-to-Ethernet converter.
+
+    All devices on the same RS-485 interface share one bus, the connection is opened when the
+    first config entry using it is set up and kept open until the last one is unloaded.
+
+    Frames are written one at a time by a single writer task. A frame waiting to be sent is
+    replaced by any newer frame for the same device address, only the latest command matters. The
+    caller of the replaced frame is told right away that its frame is not sent.
+
+    A lost connection is detected by a reader task and restored in the background, with a
+    jittered exponential backoff so a converter that is slow to accept clients again is not
+    hammered. Commands are held while the connection is being restored and sent in one go when
+    it is back, commands that are not sent within COMMAND_EXPIRY seconds are dropped.
+
+    When listening, the reader task also parses the frames other controllers send on the bus and
+    passes them to the listeners of their device address. Echoes of the frames written by the bus
+    itself are ignored.
+    """
+
+    _reader: asyncio.StreamReader | None = None
+    _writer: asyncio.StreamWriter | None = None
+    _writer_task: asyncio.Task | None = None
+    _reader_task: asyncio.Task | None = None
+    _reconnect_task: asyncio.Task | None = None
+    _closing = False
+
+    def __init__(self, data: Mapping[str, Any], listen: bool = False) -> None:
+        """Initialize the bus."""
+        self.connection_string = get_connection_string(data)
+        self._listen = listen
+        self._connection_type = data.get(
+            CONF_CONNECTION_TYPE, CONF_CONNECTION_TYPE_SERIAL
+        )
+        self._serial_port = data.get(CONF_SERIAL_PORT)
+        self._host = data.get(CONF_HOST)
+        self._port = data.get(CONF_PORT)
+
+        # The number of config entries using this bus.
+        self.users = 0
+
+        # Listeners for frames sent by others than the integration, by device address.
+        self._frame_listeners: dict[bytes, list[Callable[[bytes], None]]] = {}
+        # Frames written while listening, with the loop time until which they can be echoed.
+        self._echoes: collections.deque[tuple[float, bytes]] = collections.deque()
+        # Records the frames sent and received when set.
+        self.recorder: XYScreensRecorder | None = None
+
+        self._lock = asyncio.Lock()
+
+        # Frames waiting to be sent, keyed by device address, in order of arrival, with the loop
+        # time they were queued at.
+        self._queue: dict[bytes, tuple[bytes, asyncio.Future, float]] = {}
+        self._queue_event = asyncio.Event()
+        self._connected_event = asyncio.Event()
+        # The number of commands dropped because the connection was not restored in time.
+        self.dropped_commands = 0
+        # Loop time at which the previous frame has left the wire.
+        self._idle_at = 0.0
+        # Loop time at which the connection was last opened.
+        self._connected_at = 0.0
+
+        # Average time in seconds from queueing a frame until it has left the wire, and the
+        # average deviation from it.
+        self.write_latency = 0.0
+        self.write_jitter = 0.0
+        self._latency_measured = False
+
+        # Counters for diagnostics, cheap enough to be updated on every write.
+        self.frames_sent = 0
+        self.bytes_written = 0
+        self.frames_received = 0
+        self.connects = 0
+        self.connect_failures = 0
+        self.connection_losses = 0
+        self.queue_high_water = 0
+        self.latency_histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.last_error: str | None = None
+        # Wall clock time of the last error.
+        self.last_error_time: float | None = None
+
+    @property
+    def connected(self) -> bool:
+        """Return True if the connection is open."""
+        return self._writer is not None and not self._writer.is_closing()
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of commands waiting to be sent."""
+        return len(self._queue)
+
+    @property
+    def reconnecting(self) -> bool:
+        """Return True if the connection is being restored in the background."""
+        return self._reconnect_task is not None and not self._reconnect_task.done()
+
+    def start(self) -> None:
+        """Open the connection in the background, retrying until it succeeds."""
+        self._start_reconnect(0.0)
+
+    async def _async_connect(self) -> None:
+        if self.connected:
+            return
+
+        loop = asyncio.get_running_loop()
+        start = time.monotonic()
+
+        try:
+            if self._connection_type == CONF_CONNECTION_TYPE_NETWORK:
+                self._reader, self._writer = await asyncio.wait_for(
+                    asyncio.open_connection(self._host, int(self._port)),
+                    timeout=CONNECT_TIMEOUT,
+                )
+                self._configure_socket(self._writer.get_extra_info("socket"))
+            else:
+                # pylint: disable=import-outside-toplevel
+                import serial_asyncio_fast as serial_asyncio
+
+                # Opening and configuring the serial port blocks, only the transport is created
+                # on the event loop.
+                serial_instance = await loop.run_in_executor(
+                    None, open_serial_port, self._serial_port
+                )
+                self._reader = asyncio.StreamReader(loop=loop)
+                protocol = asyncio.StreamReaderProtocol(self._reader, loop=loop)
+                transport, _ = await serial_asyncio.connection_for_serial(
+                    loop, lambda: protocol, serial_instance
+                )
+                self._writer = asyncio.StreamWriter(
+                    transport, protocol, self._reader, loop
+                )
+        # A SerialException is an OSError, the serial stack doesn't need to be imported to catch
+        # it.
+        except OSError as ex:
+            self.connect_failures += 1
+            self._record_error(ex)
+            raise
+
+        self.connects += 1
+        self._connected_at = loop.time()
+        self._reader_task = asyncio.create_task(self._async_reader(self._reader))
+        self._connected_event.set()
+
+        _LOGGER.debug(
+            "Bus %s connected in %.1f ms",
+            self.connection_string,
+            (time.monotonic() - start) * 1000,
+        )
+
+    @staticmethod
+    def _configure_socket(sock: socket.socket | None) -> None:
+        """Enable keepalive to detect a dead converter and send frames without delay."""
+        if sock is None:
+            return
+
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        # The keepalive timing options are not available on all platforms.
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, KEEPALIVE_IDLE)
+        if hasattr(socket, "TCP_KEEPINTVL"):
+            sock.setsockopt(
+                socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, KEEPALIVE_INTERVAL
+            )
+        if hasattr(socket, "TCP_KEEPCNT"):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, KEEPALIVE_COUNT)
+
+    async def _async_disconnect(self) -> None:
+        if self._reader_task is not None:
+            # The reader task disconnects itself when the connection is lost.
+            if self._reader_task is not asyncio.current_task():
+                self._reader_task.cancel()
+            self._reader_task = None
+
+        if self._writer is None:
+            return
+
+        writer = self._writer
+        self._reader = None
+        self._writer = None
+        self._connected_event.clear()
+
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError as ex:
+            _LOGGER.debug("Error while closing bus %s: %s", self.connection_string, ex)
+
+        _LOGGER.debug("Bus %s disconnected", self.connection_string)
+
+    async def _async_reader(self, reader: asyncio.StreamReader) -> None:
+        """Watch the connection and parse the received frames if listening or recording."""
+        parser = XYScreensFrameParser()
+        try:
+            # The devices don't send anything, without listening or recording reading only
+            # detects the end of the connection.
+            while data := await reader.read(256):
+                if self._listen or self.recorder is not None:
+                    for frame in parser.feed(data):
+                        self._receive_frame(frame)
+            _LOGGER.warning("Bus %s was closed by the other side", self.connection_string)
+            error = "Connection closed by the other side"
+        except OSError as ex:
+            _LOGGER.warning("Bus %s lost its connection: %s", self.connection_string, ex)
+            error = repr(ex)
+
+        async with self._lock:
+            if self._reader is not reader:
+                return
+            self.connection_losses += 1
+            self._record_error(error)
+            await self._async_disconnect()
+            self._start_reconnect(RECONNECT_MIN_DELAY)
+
+    def _start_reconnect(self, delay: float) -> None:
+        """Start restoring the connection in the background, unless that is already going on."""
+        if self._closing or self.reconnecting:
+            return
+
+        self._reconnect_task = asyncio.create_task(self._async_reconnect(delay))
+
+    async def _async_reconnect(self, delay: float) -> None:
+        """Try to connect until it succeeds, waiting longer after every failed attempt."""
+        while not self.connected:
+            # Spread the attempts, so several clients don't all come back at the same moment.
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+            try:
+                async with self._lock:
+                    await self._async_connect()
+            except OSError as ex:
+                _LOGGER.debug(
+                    "Reconnecting bus %s failed: %s", self.connection_string, ex
+                )
+                delay = min(max(delay * 2, RECONNECT_MIN_DELAY), RECONNECT_MAX_DELAY)
+
+    async def async_open(self) -> None:
+        """Open the connection if it is not open yet."""
+        async with self._lock:
+            await self._async_connect()
+
+    async def async_close(self) -> None:
+        """Stop the background tasks and close the connection."""
+        self._closing = True
+
+        for task in (self._reconnect_task, self._writer_task):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._reconnect_task = None
+        self._writer_task = None
+
+        for _, future, _ in self._queue.values():
+            if not future.done():
+                future.set_exception(
+                    HomeAssistantError(f"Bus {self.connection_string} closed")
+                )
+        self._queue.clear()
+
+        async with self._lock:
+            await self._async_disconnect()
+
+    async def async_write(self, frame: bytes) -> float | None:
+        """
+        Queue a frame and wait until it has been sent.
+
+        Return the loop time at which the frame has left the wire, or None when a newer frame for
+        the same address replaced it before it was sent.
+        """
+        loop = asyncio.get_running_loop()
+        address = frame[1:4]
+
+        if (queued := self._queue.pop(address, None)) is not None:
+            _LOGGER.debug("Replacing queued frame 0x%s", queued[0].hex())
+            if not queued[1].done():
+                queued[1].set_result(None)
+        elif len(self._queue) >= COMMAND_QUEUE_SIZE:
+            raise HomeAssistantError(
+                f"Command queue of bus {self.connection_string} is full"
+            )
+
+        future = loop.create_future()
+        self._queue[address] = (frame, future, loop.time())
+        self._queue_event.set()
+        self.queue_high_water = max(self.queue_high_water, len(self._queue))
+
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._async_writer())
+
+        return await asyncio.shield(future)
+
+    async def async_write_external(self, frame: bytes) -> bool:
+        """
+        Write a frame from an external client and update the devices at its address.
+
+        The frame is queued like any command of the integration, replacing a queued frame for the
+        same address. Return False if the frame was replaced in turn and not sent.
+        """
+        if await self.async_write(frame) is None:
+            return False
+
+        self.dispatch_frame(frame)
+        return True
+
+    def _receive_frame(self, frame: bytes) -> None:
+        """Pass a received frame to the listeners, unless it is an echo of a written frame."""
+        if self.recorder is not None:
+            self.recorder.record(DIRECTION_RECEIVED, frame)
+
+        if not self._listen:
+            return
+
+        now = asyncio.get_running_loop().time()
+        while self._echoes and self._echoes[0][0] < now:
+            self._echoes.popleft()
+
+        for echo in self._echoes:
+            if echo[1] == frame:
+                self._echoes.remove(echo)
+                return
+
+        self.frames_received += 1
+        self.dispatch_frame(frame)
+
+    @callback
+    def async_add_frame_listener(
+        self, address: bytes, listener: Callable[[bytes], None]
+    ) -> CALLBACK_TYPE:
+        """Listen for frames to the device address sent by others, return the remove function."""
+        self._frame_listeners.setdefault(address, []).append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            listeners = self._frame_listeners[address]
+            listeners.remove(listener)
+            if not listeners:
+                del self._frame_listeners[address]
+
+        return remove_listener
+
+    def dispatch_frame(self, frame: bytes) -> None:
+        """Pass a frame sent by others to the listeners of its device address."""
+        for listener in self._frame_listeners.get(frame[1:4], ()):
+            try:
+                listener(frame)
+            except Exception:  # pylint: disable=broad-exception-caught
+                _LOGGER.exception("Error handling frame 0x%s", frame.hex())
+
+    async def async_write_batch(self, frames: list[bytes]) -> list[float | None]:
+        """
+        Write several frames to the bus in one go, for moving multiple devices at the same time.
+
+        Any queued frames for the same device addresses are replaced by the batch and not sent.
+        While the connection is being restored the frames are queued, they are sent together when
+        it is back. Return the loop time at which every frame has left the wire, or None for a
+        frame that was replaced before it was sent.
+        """
+        if not self.connected and self.reconnecting:
+            return list(
+                await asyncio.gather(*(self.async_write(frame) for frame in frames))
+            )
+
+        queued_at = asyncio.get_running_loop().time()
+        for frame in frames:
+            if (queued := self._queue.pop(frame[1:4], None)) is not None:
+                if not queued[1].done():
+                    queued[1].set_result(None)
+
+        return list(await self._async_write_frame(b"".join(frames), queued_at))
+
+    async def _async_writer(self) -> None:
+        """Write the queued frames to the bus, one at a time."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            await self._queue_event.wait()
+            self._queue_event.clear()
+
+            while self._queue:
+                if not self.connected and self.reconnecting:
+                    await self._async_hold_queue()
+                    continue
+
+                # Wait until the previous frame has left the wire, newer frames for the same
+                # address can still replace a queued frame in the meantime.
+                if (delay := self._idle_at - loop.time()) > 0:
+                    await asyncio.sleep(delay)
+                    continue
+
+                address = next(iter(self._queue))
+                frame, future, queued_at = self._queue.pop(address)
+
+                try:
+                    sent_at = await self._async_write_frame(frame, queued_at)
+                except Exception as ex:  # pylint: disable=broad-exception-caught
+                    if not future.done():
+                        future.set_exception(ex)
+                else:
+                    if not future.done():
+                        future.set_result(sent_at[0])
+
+    async def _async_hold_queue(self) -> None:
+        """
+        Hold the queued frames until the connection is restored and send them in one go.
+
+        Frames that are queued for longer than COMMAND_EXPIRY seconds are dropped, the newest
+        frame for every address has already replaced any older ones.
+        """
+        loop = asyncio.get_running_loop()
+
+        now = loop.time()
+        for address, (frame, future, queued_at) in list(self._queue.items()):
+            if now - queued_at < COMMAND_EXPIRY:
+                continue
+
+            del self._queue[address]
+            self.dropped_commands += 1
+            _LOGGER.warning(
+                "Dropped command 0x%s, bus %s is not connected (%d dropped so far)",
+                frame.hex(),
+                self.connection_string,
+                self.dropped_commands,
+            )
+            if not future.done():
+                future.set_exception(
+                    HomeAssistantError(
+                        f"Bus {self.connection_string} is not connected"
+                    )
+                )
+
+        if not self._queue:
+            return
+
+        # The queue is in order of arrival, the first frame expires first.
+        expires_at = next(iter(self._queue.values()))[2] + COMMAND_EXPIRY
+        try:
+            await asyncio.wait_for(self._connected_event.wait(), expires_at - now)
+        except TimeoutError:
+            return
+
+        queued = list(self._queue.values())
+        self._queue.clear()
+        _LOGGER.debug(
+            "Bus %s reconnected, sending %d queued frame(s)",
+            self.connection_string,
+            len(queued),
+        )
+
+        try:
+            sent_at = await self._async_write_frame(
+                b"".join(frame for frame, _, _ in queued)
+            )
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            for _, future, _ in queued:
+                if not future.done():
+                    future.set_exception(ex)
+        else:
+            for (_, future, _), frame_sent_at in zip(queued, sent_at):
+                if not future.done():
+                    future.set_result(frame_sent_at)
+
+    async def _async_write_frame(
+        self, frame: bytes, queued_at: float | None = None
+    ) -> list[float]:
+        """
+        Write one or more joined frames to the bus, (re)connecting if needed.
+
+        Return the loop time at which every frame has left the wire. The write latency is measured
+        from queued_at, if given.
+        """
+        loop = asyncio.get_running_loop()
+
+        async with self._lock:
+            await self._async_connect()
+
+            if (delay := self._idle_at - loop.time()) > 0:
+                await asyncio.sleep(delay)
+
+            _LOGGER.debug("Sending: 0x%s", frame.hex())
+            try:
+                self._writer.write(frame)
+                await self._writer.drain()
+            except OSError as ex:
+                # Drop the broken connection and restore it in the background.
+                self.connection_losses += 1
+                self._record_error(ex)
+                await self._async_disconnect()
+                self._start_reconnect(RECONNECT_MIN_DELAY)
+                raise
+
+            written_at = loop.time()
+            self._idle_at = written_at + transmit_time(frame)
+            sent_at = [
+                written_at + transmit_time(frame[: offset + FRAME_LENGTH])
+                for offset in range(0, len(frame), FRAME_LENGTH)
+            ]
+            self.frames_sent += len(frame) // FRAME_LENGTH
+            self.bytes_written += len(frame)
+
+            if self.recorder is not None:
+                self.recorder.record(DIRECTION_SENT, frame)
+
+            if self._listen:
+                # A shared line or converter may send the frames back.
+                while self._echoes and self._echoes[0][0] < loop.time():
+                    self._echoes.popleft()
+                expires_at = self._idle_at + ECHO_TIMEOUT
+                for offset in range(0, len(frame), FRAME_LENGTH):
+                    self._echoes.append(
+                        (expires_at, frame[offset : offset + FRAME_LENGTH])
+                    )
+
+            # Connecting takes much longer than writing, don't let it skew the average. That
+            # includes a reconnect by another task while the frames were waiting for the lock.
+            if queued_at is not None and queued_at >= self._connected_at:
+                # Every frame is recorded with the latency it would have had on its own, without
+                # the wire time of the frames before it in the same write.
+                latency = sent_at[0] - queued_at
+                for _ in sent_at:
+                    self._record_latency(latency)
+
+            return sent_at
+
+    def _record_error(self, error: Exception | str) -> None:
+        self.last_error = error if isinstance(error, str) else repr(error)
+        self.last_error_time = time.time()
+
+    def _record_latency(self, latency: float) -> None:
+        """Record the write latency in the histogram and the moving averages."""
+        self.latency_histogram[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+        if not self._latency_measured:
+            self.write_latency = latency
+            self._latency_measured = True
+            return
+
+        deviation = abs(latency - self.write_latency)
+        self.write_latency += LATENCY_SMOOTHING * (latency - self.write_latency)
+        self.write_jitter += LATENCY_SMOOTHING * (deviation - self.write_jitter)
+
+
+async def async_acquire_bus(hass: HomeAssistant, entry: ConfigEntry) -> XYScreensBus:
+    """Return the shared bus for the config entry and register the entry as a user."""
+    buses: dict[str, XYScreensBus] = hass.data.setdefault(DOMAIN, {}).setdefault(
+        DATA_BUSES, {}
+    )
+
+    connection_string = get_connection_string(entry.data)
+    if (bus := buses.get(connection_string)) is None:
+        bus = buses[connection_string] = XYScreensBus(
+            entry.data, entry.options.get(CONF_LISTEN, False)
+        )
+        # A serial port is opened by the setup of the entry, which fails if it can't be opened.
+        if (
+            entry.data.get(CONF_CONNECTION_TYPE, CONF_CONNECTION_TYPE_SERIAL)
+            == CONF_CONNECTION_TYPE_NETWORK
+        ):
+            bus.start()
+
+    bus.users += 1
+    _LOGGER.debug("Bus %s has %d user(s)", connection_string, bus.users)
+
+    return bus
+
+
+async def async_release_bus(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Unregister the config entry as a user and close the bus if it was the last one."""
+    buses: dict[str, XYScreensBus] = hass.data[DOMAIN][DATA_BUSES]
+
+    connection_string = get_connection_string(entry.data)
+    if (bus := buses.get(connection_string)) is None:
+        return
+
+    bus.users -= 1
+    _LOGGER.debug("Bus %s has %d user(s)", connection_string, bus.users)
+
+    if bus.users <= 0:
+        buses.pop(connection_string)
+        await bus.async_close()
@@ -2,14 +2,21 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 from typing import Any, Tuple
 
-import serial.tools.list_ports
 import voluptuous as vol
-from homeassistant.config_entries import ConfigEntry, ConfigFlow, OptionsFlow
-from homeassistant.const import UnitOfTime
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigSubentryData,
+    ConfigSubentryFlow,
+    OptionsFlow,
+    SubentryFlowResult,
+)
+from homeassistant.const import UnitOfFrequency, UnitOfTime
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.selector import (
@@ -36,21 +43,103 @@ from .const import (
     CONF_DEVICE_TYPE_PROJECTOR_SCREEN,
     CONF_HOST,
     CONF_INVERTED,
+    CONF_LISTEN,
+    CONF_MULTIPLEXER_PORT,
     CONF_PORT,
+    CONF_POSITION_DEBOUNCE,
+    CONF_RECORD,
     CONF_SERIAL_PORT,
     CONF_TIME_CLOSE,
     CONF_TIME_OPEN,
+    CONF_UPDATE_RATE,
+    DEFAULT_POSITION_DEBOUNCE,
+    DEFAULT_UPDATE_RATE,
     DOMAIN,
+    SUBENTRY_TYPE_DEVICE,
 )
+from .serial_ports import get_serial_ports
 
 _LOGGER = logging.getLogger(__name__)
 
+# Seconds the connection test of a new bus may take.
+VALIDATION_TIMEOUT = 5.0
+
+# Fields to add a device to a bus.
+_DEVICE_SCHEMA = {
+    vol.Required(CONF_ADDRESS, default=""): SelectSelector(
+        SelectSelectorConfig(
+            options=[
+                SelectOptionDict(value="AAEEEE", label="AAEEEE (XY Screens)"),
+                SelectOptionDict(value="EEEEEE", label="EEEEEE (See Max)"),
+            ],
+            custom_value=True,
+            sort=True,
+        )
+    ),
+    vol.Required(
+        CONF_DEVICE_TYPE, default=CONF_DEVICE_TYPE_PROJECTOR_SCREEN
+    ): SelectSelector(
+        SelectSelectorConfig(
+            options=[
+                SelectOptionDict(
+                    value=CONF_DEVICE_TYPE_PROJECTOR_SCREEN,
+                    label=CONF_DEVICE_TYPE_PROJECTOR_SCREEN,
+                ),
+                SelectOptionDict(
+                    value=CONF_DEVICE_TYPE_PROJECTOR_LIFT,
+                    label=CONF_DEVICE_TYPE_PROJECTOR_LIFT,
+                ),
+            ],
+            translation_key=CONF_DEVICE_TYPE,
+        )
+    ),
+    vol.Required(CONF_TIME_OPEN, default=1): NumberSelector(
+        NumberSelectorConfig(
+            min=1,
+            mode=NumberSelectorMode.BOX,
+            unit_of_measurement=UnitOfTime.SECONDS,
+        )
+    ),
+    vol.Required(CONF_TIME_CLOSE, default=1): NumberSelector(
+        NumberSelectorConfig(
+            min=1,
+            mode=NumberSelectorMode.BOX,
+            unit_of_measurement=UnitOfTime.SECONDS,
+        )
+    ),
+    vol.Required(CONF_INVERTED, default=False): BooleanSelector(),
+}
+
+
+def validate_address(address: str, errors: dict[str, str]) -> str:
+    """Return the address as lowercase hexadecimal string, set an error if it is invalid."""
+    try:
+        address = bytes.fromhex(address).hex()
+
+        if len(address) != 6:
+            errors[CONF_ADDRESS] = "invalid_address"
+    except ValueError:
+        errors[CONF_ADDRESS] = "invalid_address"
+
+    return address
+
+
+def get_device_data(address: str, data: dict[str, Any]) -> dict[str, Any]:
+    """Return the subentry data of a device."""
+    return {
+        CONF_ADDRESS: address,
+        CONF_DEVICE_TYPE: data[CONF_DEVICE_TYPE],
+        CONF_TIME_OPEN: data[CONF_TIME_OPEN],
+        CONF_TIME_CLOSE: data[CONF_TIME_CLOSE],
+        CONF_INVERTED: data[CONF_INVERTED],
+    }
+
 
 class XYScreensConfigFlow(ConfigFlow, domain=DOMAIN):
     """Handle the config flow for XY Screens."""
 
-    VERSION = 2
-    MINOR_VERSION = 2
+    VERSION = 4
+    MINOR_VERSION = 1
 
     _step_connection_type_schema: vol.Schema
     _step_setup_connection_schema: vol.Schema
@@ -120,19 +209,23 @@ class XYScreensConfigFlow(ConfigFlow, domain=DOMAIN):
 
         if user_input is not None and CONF_ADDRESS in user_input:
             # User has submitted the form
-            title, data, options = await self.validate_input_setup_connection(
+            title, data, subentry = await self.validate_input_setup_connection(
                 user_input, errors
             )
 
             if not errors:
-                return self.async_create_entry(title=title, data=data, options=options)
+                return self.async_create_entry(
+                    title=title, data=data, subentries=[subentry]
+                )
 
         # Build schema based on connection type
         schema_fields = {}
 
         if connection_type == CONF_CONNECTION_TYPE_SERIAL:
             # Serial port configuration
-            ports = await self.hass.async_add_executor_job(serial.tools.list_ports.comports)
+            ports = await self.hass.async_add_executor_job(
+                get_serial_ports(self.hass).get_ports
+            )
             list_of_ports = {}
             for port in ports:
                 list_of_ports[port.device] = (
@@ -175,53 +268,8 @@ class XYScreensConfigFlow(ConfigFlow, domain=DOMAIN):
             )
         )
 
-        # Common fields (address, device type, timing, etc.)
-        schema_fields.update({
-            vol.Required(CONF_ADDRESS, default=""): SelectSelector(
-                SelectSelectorConfig(
-                    options=[
-                        SelectOptionDict(
-                            value="AAEEEE", label="AAEEEE (XY Screens)"
-                        ),
-                        SelectOptionDict(value="EEEEEE", label="EEEEEE (See Max)"),
-                    ],
-                    custom_value=True,
-                    sort=True,
-                )
-            ),
-            vol.Required(
-                CONF_DEVICE_TYPE, default=CONF_DEVICE_TYPE_PROJECTOR_SCREEN
-            ): SelectSelector(
-                SelectSelectorConfig(
-                    options=[
-                        SelectOptionDict(
-                            value=CONF_DEVICE_TYPE_PROJECTOR_SCREEN,
-                            label=CONF_DEVICE_TYPE_PROJECTOR_SCREEN,
-                        ),
-                        SelectOptionDict(
-                            value=CONF_DEVICE_TYPE_PROJECTOR_LIFT,
-                            label=CONF_DEVICE_TYPE_PROJECTOR_LIFT,
-                        ),
-                    ],
-                    translation_key=CONF_DEVICE_TYPE,
-                )
-            ),
-            vol.Required(CONF_TIME_OPEN, default=1): NumberSelector(
-                NumberSelectorConfig(
-                    min=1,
-                    mode=NumberSelectorMode.BOX,
-                    unit_of_measurement=UnitOfTime.SECONDS,
-                )
-            ),
-            vol.Required(CONF_TIME_CLOSE, default=1): NumberSelector(
-                NumberSelectorConfig(
-                    min=1,
-                    mode=NumberSelectorMode.BOX,
-                    unit_of_measurement=UnitOfTime.SECONDS,
-                )
-            ),
-            vol.Required(CONF_INVERTED, default=False): BooleanSelector(),
-        })
+        # The first device on the bus, more devices are added as subentries.
+        schema_fields.update(_DEVICE_SCHEMA)
 
         self._step_setup_connection_schema = vol.Schema(schema_fields)
 
@@ -241,15 +289,18 @@ class XYScreensConfigFlow(ConfigFlow, domain=DOMAIN):
     # pylint: disable=W0613
     async def validate_input_setup_connection(
         self, data: dict[str, Any], errors: dict[str, str]
-    ) -> Tuple[str, dict[str, Any], dict[str, Any]]:
+    ) -> Tuple[str, dict[str, Any], ConfigSubentryData | None]:
         """
-        Validate the user input and create data.
+        Validate the user input and create the data of the bus and its first device.
 
         Data has the keys from _step_setup_connection_schema with values provided by the user.
         """
         # Validate the data can be used to set up a connection.
         self._step_setup_connection_schema(data)
 
+        # The cheap checks go first, the connection is only tested if they pass.
+        address = validate_address(data.get(CONF_ADDRESS), errors)
+
         connection_type = data.get(CONF_CONNECTION_TYPE)
         connection_string = ""
 
@@ -260,23 +311,13 @@ class XYScreensConfigFlow(ConfigFlow, domain=DOMAIN):
             if serial_port is None:
                 raise vol.error.RequiredFieldInvalid("No serial port configured")
 
-            serial_port = await self.hass.async_add_executor_job(
-                get_serial_by_id, serial_port
-            )
-
             # Test if the device exists
             if not os.path.exists(serial_port):
                 errors[CONF_SERIAL_PORT] = "nonexisting_serial_port"
 
-            connection_string = serial_port
-
-            # Test if we can connect to the device.
-            if errors.get(CONF_SERIAL_PORT) is None:
-                try:
-                    await test_serial_port(serial_port)
-                except serial.SerialException:
-                    errors["base"] = "cannot_connect"
+            self._async_abort_entries_match({CONF_SERIAL_PORT: serial_port})
 
+            connection_string = serial_port
         elif connection_type == CONF_CONNECTION_TYPE_NETWORK:
             # Handle network connection
             host = data.get(CONF_HOST)
@@ -286,36 +327,44 @@ class XYScreensConfigFlow(ConfigFlow, domain=DOMAIN):
                 errors[CONF_HOST] = "invalid_host"
             if not port or port < 1 or port > 65535:
                 errors[CONF_PORT] = "invalid_port"
+            else:
+                connection_string = f"{host}:{int(port)}"  # Convert float to int
 
-            connection_string = f"{host}:{int(port)}"  # Convert float to int
+                # Make sure the connection is not already used, more devices are added to the
+                # existing entry.
+                await self.async_set_unique_id(connection_string)
+                self._abort_if_unique_id_configured()
 
-            # Test if we can connect to the TCP endpoint
-            if not errors.get(CONF_HOST) and not errors.get(CONF_PORT):
-                try:
-                    await test_tcp_connection(host, port)
-                except Exception:
-                    errors["base"] = "cannot_connect"
+        if errors:
+            return connection_string, {}, None
 
-        # Validate the address.
-        address = data.get(CONF_ADDRESS)
+        # Test if we can connect, the by-id path of a serial port is looked up at the same time.
         try:
-            address = bytes.fromhex(address)
-            address = address.hex()
-
-            if len(address) != 6:
-                errors[CONF_ADDRESS] = "invalid_address"
-        except ValueError:
-            errors[CONF_ADDRESS] = "invalid_address"
+            async with asyncio.timeout(VALIDATION_TIMEOUT):
+                if connection_type == CONF_CONNECTION_TYPE_SERIAL:
+                    connection_string, _ = await asyncio.gather(
+                        self.hass.async_add_executor_job(
+                            get_serial_ports(self.hass).get_serial_by_id, serial_port
+                        ),
+                        test_serial_port(serial_port),
+                    )
+                else:
+                    await test_tcp_connection(host, int(port))
+        # A SerialException is an OSError, a host name that can't be encoded, like "foo..bar",
+        # raises a UnicodeError, which is a ValueError.
+        except (TimeoutError, OSError, ValueError):
+            errors["base"] = "cannot_connect"
+            return connection_string, {}, None
 
-        # Make sure the connection and address combination is not already used.
-        await self.async_set_unique_id(f"{connection_string}-{address}")
-        self._abort_if_unique_id_configured()
+        if connection_type == CONF_CONNECTION_TYPE_SERIAL:
+            # Make sure the connection is not already used, more devices are added to the
+            # existing entry.
+            await self.async_set_unique_id(connection_string)
+            self._abort_if_unique_id_configured()
 
         # Build data structure based on connection type
         entry_data = {
             CONF_CONNECTION_TYPE: connection_type,
-            CONF_ADDRESS: address,
-            CONF_DEVICE_TYPE: data[CONF_DEVICE_TYPE],
         }
 
         if connection_type == CONF_CONNECTION_TYPE_SERIAL:
@@ -324,17 +373,26 @@ class XYScreensConfigFlow(ConfigFlow, domain=DOMAIN):
             entry_data[CONF_HOST] = data[CONF_HOST]
             entry_data[CONF_PORT] = data[CONF_PORT]
 
-        # Return title, data and options
+        # Return title, data and the subentry of the device
         return (
-            f"{connection_string} {address.upper()}",
+            connection_string,
             entry_data,
-            {
-                CONF_TIME_OPEN: data[CONF_TIME_OPEN],
-                CONF_TIME_CLOSE: data[CONF_TIME_CLOSE],
-                CONF_INVERTED: data[CONF_INVERTED],
-            },
+            ConfigSubentryData(
+                data=get_device_data(address, data),
+                subentry_type=SUBENTRY_TYPE_DEVICE,
+                title=address.upper(),
+                unique_id=address,
+            ),
         )
 
+    @classmethod
+    @callback
+    def async_get_supported_subentry_types(
+        cls, config_entry: ConfigEntry
+    ) -> dict[str, type[ConfigSubentryFlow]]:
+        """Return the subentries supported by the bus."""
+        return {SUBENTRY_TYPE_DEVICE: XYScreensDeviceSubentryFlowHandler}
+
     @staticmethod
     @callback
     def async_get_options_flow(
@@ -345,7 +403,40 @@ class XYScreensConfigFlow(ConfigFlow, domain=DOMAIN):
 
 
 class XYScreensOptionsFlowHandler(OptionsFlow):
-    """Handle the options flow for XY Screens."""
+    """Handle the options of a bus."""
+
+    _OPTIONS_SCHEMA = vol.Schema(
+        {
+            vol.Required(CONF_LISTEN, default=False): BooleanSelector(),
+            vol.Optional(CONF_MULTIPLEXER_PORT): NumberSelector(
+                NumberSelectorConfig(
+                    min=1,
+                    max=65535,
+                    mode=NumberSelectorMode.BOX,
+                )
+            ),
+            vol.Required(CONF_RECORD, default=False): BooleanSelector(),
+        }
+    )
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            self._OPTIONS_SCHEMA(user_input)
+            return self.async_create_entry(title="", data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(
+                self._OPTIONS_SCHEMA, self.config_entry.options
+            ),
+        )
+
+
+class XYScreensDeviceSubentryFlowHandler(ConfigSubentryFlow):
+    """Handle adding and reconfiguring the devices on a bus."""
 
     _OPTIONS_SCHEMA = vol.Schema(
         {
@@ -373,29 +464,84 @@ class XYScreensOptionsFlowHandler(OptionsFlow):
                 CONF_INVERTED,
                 default=False,
             ): BooleanSelector(),
+            vol.Required(
+                CONF_POSITION_DEBOUNCE,
+                default=DEFAULT_POSITION_DEBOUNCE,
+            ): NumberSelector(
+                NumberSelectorConfig(
+                    min=0,
+                    max=5,
+                    step=0.1,
+                    mode=NumberSelectorMode.BOX,
+                    unit_of_measurement=UnitOfTime.SECONDS,
+                )
+            ),
+            vol.Required(
+                CONF_UPDATE_RATE,
+                default=DEFAULT_UPDATE_RATE,
+            ): NumberSelector(
+                NumberSelectorConfig(
+                    min=0,
+                    max=10,
+                    step=0.5,
+                    mode=NumberSelectorMode.BOX,
+                    unit_of_measurement=UnitOfFrequency.HERTZ,
+                )
+            ),
         }
     )
 
-    async def async_step_init(
+    async def async_step_user(
         self, user_input: dict[str, Any] | None = None
-    ) -> FlowResult:
-        """Manage the options."""
+    ) -> SubentryFlowResult:
+        """Add a device to the bus."""
         errors: dict[str, str] = {}
 
         if user_input is not None:
-            self._OPTIONS_SCHEMA(user_input)
-            return self.async_create_entry(title="", data=user_input)
+            address = validate_address(user_input.get(CONF_ADDRESS), errors)
+
+            # Make sure the address is not already used on this bus.
+            if any(
+                subentry.unique_id == address
+                for subentry in self._get_entry().subentries.values()
+            ):
+                return self.async_abort(reason="already_configured")
 
+            if not errors:
+                return self.async_create_entry(
+                    title=address.upper(),
+                    data=get_device_data(address, user_input),
+                    unique_id=address,
+                )
+
+        data_schema = vol.Schema(_DEVICE_SCHEMA)
         if user_input is not None:
-            data_schema = self.add_suggested_values_to_schema(
-                self._OPTIONS_SCHEMA, user_input
-            )
-        else:
-            data_schema = self.add_suggested_values_to_schema(
-                self._OPTIONS_SCHEMA, self.config_entry.options
+            data_schema = self.add_suggested_values_to_schema(data_schema, user_input)
+
+        return self.async_show_form(
+            step_id="user",
+            data_schema=data_schema,
+            errors=errors,
+        )
+
+    async def async_step_reconfigure(
+        self, user_input: dict[str, Any] | None = None
+    ) -> SubentryFlowResult:
+        """Manage the options of a device."""
+        errors: dict[str, str] = {}
+        subentry = self._get_reconfigure_subentry()
+
+        if user_input is not None:
+            self._OPTIONS_SCHEMA(user_input)
+            return self.async_update_and_abort(
+                self._get_entry(), subentry, data_updates=user_input
             )
 
-        device_type = self.config_entry.data.get(CONF_DEVICE_TYPE)
+        data_schema = self.add_suggested_values_to_schema(
+            self._OPTIONS_SCHEMA, subentry.data
+        )
+
+        device_type = subentry.data.get(CONF_DEVICE_TYPE)
         return self.async_show_form(
             step_id=device_type,
             data_schema=data_schema,
@@ -404,24 +550,12 @@ class XYScreensOptionsFlowHandler(OptionsFlow):
 
     async def async_step_projector_screen(
         self, user_input: dict[str, Any] | None = None
-    ) -> FlowResult:
+    ) -> SubentryFlowResult:
         """Manage the options."""
-        return await self.async_step_init(user_input)
+        return await self.async_step_reconfigure(user_input)
 
     async def async_step_projector_lift(
         self, user_input: dict[str, Any] | None = None
-    ) -> FlowResult:
+    ) -> SubentryFlowResult:
         """Manage the options."""
-        return await self.async_step_init(user_input)
-
-
-def get_serial_by_id(dev_path: str) -> str:
-    """Return a /dev/serial/by-id match for given device if available."""
-    by_id = "/dev/serial/by-id"
-    if not os.path.isdir(by_id):
-        return dev_path
-
-    for path in (entry.path for entry in os.scandir(by_id) if entry.is_symlink()):
-        if os.path.realpath(path) == dev_path:
-            return path
-    return dev_path
+        return await self.async_step_reconfigure(user_input)
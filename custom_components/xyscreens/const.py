@@ -10,6 +10,14 @@ CONF_SERIAL_PORT = "serial_port"
 CONF_HOST = "host"
 CONF_PORT = "port"
 
+# Bus options
+CONF_MULTIPLEXER_PORT = "multiplexer_port"
+CONF_LISTEN = "listen"
+CONF_RECORD = "record"
+
+# Subentry types
+SUBENTRY_TYPE_DEVICE = "device"
+
 # Device configuration
 CONF_ADDRESS = "address"
 CONF_DEVICE_TYPE = "device_type"
@@ -18,3 +26,31 @@ CONF_DEVICE_TYPE_PROJECTOR_LIFT = "projector_lift"
 CONF_TIME_OPEN = "time_open"
 CONF_TIME_CLOSE = "time_close"
 CONF_INVERTED = "inverted"
+CONF_POSITION_DEBOUNCE = "position_debounce"
+CONF_UPDATE_RATE = "update_rate"
+
+# Defaults
+DEFAULT_POSITION_DEBOUNCE = 0.5
+DEFAULT_UPDATE_RATE = 2.0
+
+# Keys in hass.data[DOMAIN]
+DATA_BUSES = "buses"
+DATA_COVERS = "covers"
+DATA_MOTION = "motion"
+DATA_MULTIPLEXERS = "multiplexers"
+DATA_POSITIONS = "positions"
+DATA_RECORDERS = "recorders"
+DATA_SERIAL_PORTS = "serial_ports"
+
+# Dispatcher signals, formatted with the config entry id
+SIGNAL_DEVICES_UPDATED = "xyscreens_devices_updated_{}"
+
+# Entity attributes
+ATTR_POSITION_ERROR = "position_error"
+
+# Services
+SERVICE_MOVE_GROUP = "move_group"
+ATTR_COMMAND = "command"
+COMMAND_OPEN = "open"
+COMMAND_CLOSE = "close"
+COMMAND_STOP = "stop"
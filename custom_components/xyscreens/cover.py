@@ -2,7 +2,11 @@
 
 from __future__ import annotations
 
+import dataclasses
 import logging
+import time
+from collections.abc import Mapping
+from datetime import datetime
 from typing import Any
 
 from homeassistant.components.cover import (
@@ -13,27 +17,38 @@ from homeassistant.components.cover import (
     CoverEntityFeature,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.restore_state import RestoreEntity
-from xyscreens import XYScreens, XYScreensState
 
+from .bus import XYScreensBus, get_connection_string
 from .const import (
+    ATTR_POSITION_ERROR,
     CONF_ADDRESS,
-    CONF_CONNECTION_TYPE,
-    CONF_CONNECTION_TYPE_NETWORK,
-    CONF_CONNECTION_TYPE_SERIAL,
     CONF_DEVICE_TYPE,
     CONF_DEVICE_TYPE_PROJECTOR_LIFT,
-    CONF_HOST,
     CONF_INVERTED,
-    CONF_PORT,
-    CONF_SERIAL_PORT,
+    CONF_POSITION_DEBOUNCE,
     CONF_TIME_CLOSE,
     CONF_TIME_OPEN,
+    CONF_UPDATE_RATE,
+    DATA_BUSES,
+    DATA_COVERS,
+    DATA_MOTION,
+    DATA_POSITIONS,
+    DEFAULT_POSITION_DEBOUNCE,
+    DEFAULT_UPDATE_RATE,
     DOMAIN,
+    SIGNAL_DEVICES_UPDATED,
+    SUBENTRY_TYPE_DEVICE,
 )
+from .frames import XYScreensFrames, get_frames
+from .motion import XYScreensMotionScheduler
+from .screen import XYScreensBusScreen, XYScreensState
+from .store import XYScreensPositionStore
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -44,31 +59,55 @@ async def async_setup_entry(
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
-    """Set up the XY Screens cover."""
-    # Build connection string based on connection type
-    connection_type = config_entry.data.get(CONF_CONNECTION_TYPE, CONF_CONNECTION_TYPE_SERIAL)
-
-    if connection_type == CONF_CONNECTION_TYPE_NETWORK:
-        # Network connection: build host:port string
-        host = config_entry.data.get(CONF_HOST)
-        port = config_entry.data.get(CONF_PORT)
-        connection_string = f"{host}:{int(port)}"  # Convert float to int
-    else:
-        # Serial connection: use serial port path
-        connection_string = config_entry.data.get(CONF_SERIAL_PORT)
-
-    async_add_entities(
-        [
-            XYScreensCover(
-                config_entry.entry_id,
-                connection_string,
-                bytes.fromhex(config_entry.data.get(CONF_ADDRESS, "AAEEEE")),
-                config_entry.data.get(CONF_DEVICE_TYPE),
-                config_entry.options.get(CONF_TIME_OPEN),
-                config_entry.options.get(CONF_TIME_CLOSE),
-                config_entry.options.get(CONF_INVERTED),
+    """Set up the XY Screens covers of all devices on the bus."""
+    # The bus of the serial port or TCP endpoint, shared by all devices
+    bus = hass.data[DOMAIN][DATA_BUSES][get_connection_string(config_entry.data)]
+    motion = hass.data[DOMAIN][DATA_MOTION]
+    store = hass.data[DOMAIN][DATA_POSITIONS]
+
+    # The covers of the entry by subentry id.
+    covers: dict[str, XYScreensCover] = {}
+
+    @callback
+    def async_update_devices() -> None:
+        """Add covers for new devices and apply changed settings to the existing covers."""
+        removed = covers.keys() - config_entry.subentries.keys()
+        for subentry_id in removed:
+            # The entity is removed together with the subentry.
+            del covers[subentry_id]
+        store.async_remove(removed)
+
+        for subentry in config_entry.subentries.values():
+            if subentry.subentry_type != SUBENTRY_TYPE_DEVICE:
+                continue
+
+            if (cover := covers.get(subentry.subentry_id)) is not None:
+                cover.update_settings(subentry.data)
+                continue
+
+            cover = covers[subentry.subentry_id] = XYScreensCover(
+                subentry.subentry_id,
+                bus,
+                motion,
+                store,
+                get_frames(subentry.data.get(CONF_ADDRESS, "aaeeee")),
+                subentry.data.get(CONF_DEVICE_TYPE),
+                subentry.data.get(CONF_TIME_OPEN),
+                subentry.data.get(CONF_TIME_CLOSE),
+                subentry.data.get(CONF_INVERTED),
+                subentry.data.get(CONF_POSITION_DEBOUNCE, DEFAULT_POSITION_DEBOUNCE),
+                subentry.data.get(CONF_UPDATE_RATE, DEFAULT_UPDATE_RATE),
             )
-        ]
+            async_add_entities([cover], config_subentry_id=subentry.subentry_id)
+
+    async_update_devices()
+
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_DEVICES_UPDATED.format(config_entry.entry_id),
+            async_update_devices,
+        )
     )
 
 
@@ -88,13 +127,17 @@ class XYScreensCover(CoverEntity, RestoreEntity):
 
     def __init__(
         self,
-        config_entry_id: str,
-        connection_string: str,
-        address: bytes,
+        subentry_id: str,
+        bus: XYScreensBus,
+        motion: XYScreensMotionScheduler,
+        store: XYScreensPositionStore,
+        frames: XYScreensFrames,
         device_type: str,
         time_open: int,
         time_close: int,
         inverted: bool,
+        position_debounce: float,
+        update_rate: float,
     ) -> None:
         """Initialize the screen."""
         if device_type == CONF_DEVICE_TYPE_PROJECTOR_LIFT:
@@ -103,11 +146,11 @@ class XYScreensCover(CoverEntity, RestoreEntity):
             translation_key = "projector_screen"
 
         self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, config_entry_id)},
+            identifiers={(DOMAIN, subentry_id)},
             translation_key=translation_key,
             manufacturer="XY Screens",
         )
-        self._attr_unique_id = config_entry_id
+        self._attr_unique_id = subentry_id
 
         if inverted:
             translation_key += "_inverted"
@@ -119,38 +162,138 @@ class XYScreensCover(CoverEntity, RestoreEntity):
             name=None,  # Inherit the device name
         )
 
-        # Create XYScreens instance with connection string (serial port or TCP endpoint)
-        self._screen = XYScreens(connection_string, address, time_open, time_close)
+        # Create XYScreens instance sending its commands over the shared bus
+        self._screen = XYScreensBusScreen(bus, motion, frames, time_open, time_close)
 
         self._inverted = inverted
 
+        # Saves the position to restore after a restart.
+        self._store = store
+
+        # Slider drags result in many position changes in a short time, after a move is started
+        # only the latest position within the debounce window is applied.
+        self._position_debounce = position_debounce
+        self._pending_position: int | None = None
+        self._debounce_unsub: CALLBACK_TYPE | None = None
+
+        # While moving the position changes continuously, the state is written at most
+        # update_rate times per second. A rate of 0 writes every progress report of the screen,
+        # which are as frequent as the motion scheduler allows.
+        self._update_interval = self._get_update_interval(update_rate)
+        self._screen.progress_interval = self._update_interval
+        self._written_state: XYScreensState | None = None
+        self._last_write = 0.0
+        self._write_unsub: CALLBACK_TYPE | None = None
+
+    @staticmethod
+    def _get_update_interval(update_rate: float) -> float:
+        return 1 / update_rate if update_rate > 0 else 0.0
+
+    @callback
+    def update_settings(self, data: Mapping[str, Any]) -> None:
+        """Apply changed device settings, keeping the position and any move in progress."""
+        self._screen.set_durations(data.get(CONF_TIME_OPEN), data.get(CONF_TIME_CLOSE))
+
+        self._position_debounce = data.get(
+            CONF_POSITION_DEBOUNCE, DEFAULT_POSITION_DEBOUNCE
+        )
+        self._update_interval = self._get_update_interval(
+            data.get(CONF_UPDATE_RATE, DEFAULT_UPDATE_RATE)
+        )
+        self._screen.progress_interval = self._update_interval
+
+        if (inverted := data.get(CONF_INVERTED)) != self._inverted:
+            self._inverted = inverted
+
+            translation_key = self.entity_description.translation_key.removesuffix(
+                "_inverted"
+            )
+            if inverted:
+                translation_key += "_inverted"
+            self.entity_description = dataclasses.replace(
+                self.entity_description, translation_key=translation_key
+            )
+
+        if self.hass is None:
+            return
+
+        # Recalculate the state for the new settings and write it right away.
+        self._written_state = None
+        self._callback(self._screen.state(), self._screen.position())
+
+    @property
+    def screen(self) -> XYScreensBusScreen:
+        """Return the XYScreens instance controlling the device."""
+        return self._screen
+
+    def screen_position(self, position: float) -> float:
+        """
+        Convert a cover position to the position of the screen.
+
+        The conversion is symmetric, the same method converts a screen position to a cover
+        position.
+        """
+        if not self._inverted:
+            return 100 - position
+        return position
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the expected error of partial positions."""
+        return {ATTR_POSITION_ERROR: round(self._screen.position_error, 1)}
+
+    @property
+    def current_cover_position(self) -> int | None:
+        """Return the current position, calculated when read while the cover is moving."""
+        if self._screen.moving:
+            return round(self.screen_position(self._screen.position()))
+
+        return self._attr_current_cover_position
+
     async def async_added_to_hass(self) -> None:
         """Called when sensor is added to Home Assistant."""
-        last_state = await self.async_get_last_state()
-        if (
-            last_state is not None
-            and last_state.attributes.get(ATTR_CURRENT_POSITION) is not None
-        ):
+        # The position store is saved shortly after every change, the last state of the entity
+        # only remains for devices that were set up before the store existed.
+        if (position := self._store.get_position(self.unique_id)) is not None:
+            _LOGGER.debug("Stored screen position: %5.1f %%", position)
+            self._screen.restore_position(position)
+            self._attr_current_cover_position = round(self.screen_position(position))
+        elif (
+            last_state := await self.async_get_last_state()
+        ) is not None and last_state.attributes.get(ATTR_CURRENT_POSITION) is not None:
             position = last_state.attributes.get(ATTR_CURRENT_POSITION)
             _LOGGER.debug("Last screen position: %5.1f %%", position)
-            if not self._inverted:
-                self._screen.restore_position(100 - position)
-            else:
-                self._screen.restore_position(position)
+            self._screen.restore_position(self.screen_position(position))
             self._attr_current_cover_position = position
-            if position == 0:
-                self._attr_is_closed = True
+        self._attr_is_closed = self._attr_current_cover_position == 0
 
         self._screen.add_callback(self._callback)
 
+        # Follow the commands other controllers send to the device.
+        self.async_on_remove(
+            self._screen.bus.async_add_frame_listener(
+                self._screen.address, self._screen.handle_frame
+            )
+        )
+
+        # Make the cover available to the group move service.
+        self.hass.data[DOMAIN].setdefault(DATA_COVERS, {})[self.entity_id] = self
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Called when the entity is about to be removed from Home Assistant."""
+        self.hass.data[DOMAIN][DATA_COVERS].pop(self.entity_id, None)
+
+        self._cancel_pending_position()
+        self._cancel_pending_write()
+
+        await self._screen.async_shutdown()
+
     @callback
     def _callback(self, state: XYScreensState, position: float):
-        """Callback to be called by XYScreens library whenever a state changes."""
-        if not self._inverted:
-            position = 100 - self._screen.position()
-        else:
-            position = self._screen.position()
-        self._attr_current_cover_position = round(position)
+        """Called by the screen whenever its state or position changes."""
+        self._attr_current_cover_position = round(
+            self.screen_position(self._screen.position())
+        )
 
         if state == XYScreensState.UP:
             self._attr_is_closing = False
@@ -173,8 +316,47 @@ class XYScreensCover(CoverEntity, RestoreEntity):
             self._attr_is_closed = not self._inverted
             self._attr_is_opening = False
 
+        self._store.async_update(self.unique_id, state, self._screen.position())
+
+        # State changes, and thus also the terminal states Up, Down and Stopped, are written
+        # immediately. Position updates while moving are throttled.
+        if state != self._written_state:
+            self._written_state = state
+            self._async_write_state()
+            return
+
+        if self._write_unsub is not None:
+            # A write is already scheduled and will pick up the latest position.
+            return
+
+        if (delay := self._last_write + self._update_interval - time.monotonic()) > 0:
+            self._write_unsub = async_call_later(
+                self.hass, delay, self._async_write_throttled_state
+            )
+            return
+
+        self._async_write_state()
+
+    @callback
+    def _async_write_state(self) -> None:
+        """Write the state and cancel any throttled write."""
+        self._cancel_pending_write()
+        self._last_write = time.monotonic()
         self.async_write_ha_state()
 
+    @callback
+    def _async_write_throttled_state(self, _now: datetime) -> None:
+        """Write the latest state after the throttle interval."""
+        self._write_unsub = None
+        self._async_write_state()
+
+    @callback
+    def _cancel_pending_write(self) -> None:
+        """Cancel any throttled write."""
+        if self._write_unsub is not None:
+            self._write_unsub()
+            self._write_unsub = None
+
     async def _async_open_cover(self, **kwargs: Any) -> None:
         await self._screen.async_up()
 
@@ -183,6 +365,7 @@ class XYScreensCover(CoverEntity, RestoreEntity):
 
     async def async_open_cover(self, **kwargs: Any) -> None:
         """Open the cover."""
+        self._cancel_pending_position()
         if not self._inverted:
             await self._async_open_cover()
         else:
@@ -190,6 +373,7 @@ class XYScreensCover(CoverEntity, RestoreEntity):
 
     async def async_close_cover(self, **kwargs: Any) -> None:
         """Close the cover."""
+        self._cancel_pending_position()
         if not self._inverted:
             await self._async_close_cover()
         else:
@@ -197,15 +381,46 @@ class XYScreensCover(CoverEntity, RestoreEntity):
 
     async def async_stop_cover(self, **kwargs: Any) -> None:
         """Stop the cover."""
+        self._cancel_pending_position()
         await self._screen.async_stop()
 
     async def async_set_cover_position(self, **kwargs: Any) -> None:
         """Move the cover to a specific position."""
         position = kwargs[ATTR_POSITION]
+
+        if self._debounce_unsub is not None:
+            if self._screen.can_retarget(self.screen_position(position)):
+                # Retargeting the move in progress sends no frame, there is nothing to debounce.
+                self._pending_position = None
+                await self._screen.async_set_position(self.screen_position(position))
+                return
+
+            # A move was started recently, apply the latest position when the window expires.
+            self._pending_position = position
+            return
+
         if self.current_cover_position == position:
             return
 
-        if not self._inverted:
-            await self._screen.async_set_position(100 - position)
-        else:
-            await self._screen.async_set_position(position)
+        await self._screen.async_set_position(self.screen_position(position))
+
+        if self._position_debounce > 0:
+            self._debounce_unsub = async_call_later(
+                self.hass, self._position_debounce, self._async_debounce_expired
+            )
+
+    async def _async_debounce_expired(self, _now: datetime) -> None:
+        """Apply the latest position received within the debounce window."""
+        self._debounce_unsub = None
+
+        if (position := self._pending_position) is not None:
+            self._pending_position = None
+            await self.async_set_cover_position(**{ATTR_POSITION: position})
+
+    @callback
+    def _cancel_pending_position(self) -> None:
+        """Discard any position waiting for the debounce window to expire."""
+        self._pending_position = None
+        if self._debounce_unsub is not None:
+            self._debounce_unsub()
+            self._debounce_unsub = None
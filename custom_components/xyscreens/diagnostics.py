@@ -0,0 +1,107 @@
+"""Diagnostics support for the XY Screens integration."""
+
+from __future__ import annotations
+
+import re
+from typing import Any
+
+from homeassistant.components.diagnostics import REDACTED, async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .bus import LATENCY_BUCKETS, XYScreensBus, get_connection_string
+from .const import CONF_ADDRESS, CONF_HOST, DATA_BUSES, DATA_COVERS, DOMAIN
+
+TO_REDACT = {CONF_HOST}
+
+# Connection errors name the address that was connected to, which can differ from the host.
+IP_ADDRESS = re.compile(
+    r"\b(?:\d{1,3}\.){3}\d{1,3}\b|(?<![\w:])(?:[0-9a-fA-F]{0,4}:){2,7}[0-9a-fA-F]{0,4}(?![\w:])"
+)
+
+
+def _redact_error(error: str | None, host: str | None) -> str | None:
+    """Return the error without the host and IP addresses in it."""
+    if error is None:
+        return None
+
+    if host:
+        error = error.replace(host, REDACTED)
+    return IP_ADDRESS.sub(REDACTED, error)
+
+
+def _bus_diagnostics(bus: XYScreensBus, host: str | None) -> dict[str, Any]:
+    """Return the transport counters of the bus."""
+    histogram = {
+        f"<= {bound * 1000:g} ms": count
+        for bound, count in zip(LATENCY_BUCKETS, bus.latency_histogram)
+    }
+    histogram[f"> {LATENCY_BUCKETS[-1] * 1000:g} ms"] = bus.latency_histogram[-1]
+
+    return {
+        "connected": bus.connected,
+        "reconnecting": bus.reconnecting,
+        "users": bus.users,
+        "connects": bus.connects,
+        "connect_failures": bus.connect_failures,
+        "connection_losses": bus.connection_losses,
+        "last_error": _redact_error(bus.last_error, host),
+        "last_error_time": (
+            dt_util.utc_from_timestamp(bus.last_error_time).isoformat()
+            if bus.last_error_time is not None
+            else None
+        ),
+        "frames_sent": bus.frames_sent,
+        "bytes_written": bus.bytes_written,
+        "frames_received": bus.frames_received,
+        "queue_depth": bus.queue_depth,
+        "queue_high_water": bus.queue_high_water,
+        "dropped_commands": bus.dropped_commands,
+        "write_latency_ms": round(bus.write_latency * 1000, 1),
+        "write_jitter_ms": round(bus.write_jitter * 1000, 1),
+        "write_latency_histogram": histogram,
+    }
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data = hass.data.get(DOMAIN, {})
+
+    bus = data.get(DATA_BUSES, {}).get(get_connection_string(entry.data))
+
+    # The covers have the id of their subentry as unique id.
+    covers = {
+        cover.unique_id: cover
+        for cover in data.get(DATA_COVERS, {}).values()
+        if cover.unique_id in entry.subentries
+    }
+
+    devices = {}
+    for subentry_id, subentry in entry.subentries.items():
+        device: dict[str, Any] = {"data": dict(subentry.data)}
+        if (cover := covers.get(subentry_id)) is not None:
+            device.update(
+                {
+                    "entity_id": cover.entity_id,
+                    "state": cover.screen.state().name,
+                    "position": round(cover.screen.position(), 1),
+                    "moving": cover.screen.moving,
+                }
+            )
+        devices[subentry.data.get(CONF_ADDRESS)] = device
+
+    return {
+        "entry": {
+            "version": f"{entry.version}.{entry.minor_version}",
+            "data": async_redact_data(entry.data, TO_REDACT),
+        },
+        "bus": (
+            _bus_diagnostics(bus, entry.data.get(CONF_HOST))
+            if bus is not None
+            else None
+        ),
+        "devices": devices,
+    }
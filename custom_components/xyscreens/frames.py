@@ -0,0 +1,116 @@
+"""Prebuilt command frames of the XY Screens devices."""
+
+from __future__ import annotations
+
+import dataclasses
+import functools
+from collections.abc import Mapping
+from types import MappingProxyType
+
+# Every frame starts with this byte, followed by the three byte device address and the opcode.
+FRAME_PREFIX = b"\xff"
+FRAME_LENGTH = 5
+
+# The opcodes of every command, by protocol variant. XY Screens and See Max devices use the same
+# opcodes and only differ in their default address. A vendor using other opcodes is supported by
+# adding its opcode set here.
+OPCODE_SETS: Mapping[str, Mapping[str, int]] = MappingProxyType(
+    {
+        "xyscreens": MappingProxyType(
+            {
+                "up": 0xDD,
+                "down": 0xEE,
+                "stop": 0xCC,
+                "micro_up": 0xC9,
+                "micro_down": 0xE9,
+                "program": 0xAA,
+            }
+        ),
+    }
+)
+DEFAULT_OPCODE_SET = "xyscreens"
+
+# The opcodes of all protocol variants, frames with any other opcode are not parsed.
+OPCODES = frozenset(
+    opcode for opcodes in OPCODE_SETS.values() for opcode in opcodes.values()
+)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class XYScreensFrames:
+    """
+    The complete frames of all commands for one device address.
+
+    The frames are built once, instead of for every command that is sent.
+    """
+
+    address: bytes
+    up: bytes
+    down: bytes
+    stop: bytes
+    micro_up: bytes
+    micro_down: bytes
+    program: bytes
+
+
+@functools.cache
+def get_frames(address: str, opcode_set: str = DEFAULT_OPCODE_SET) -> XYScreensFrames:
+    """
+    Return the frames for the hexadecimal device address.
+
+    The frames are built once per address and shared by all devices using that address.
+    """
+    address_bytes = bytes.fromhex(address)
+    if len(address_bytes) != 3:
+        raise ValueError(f"Invalid device address {address}")
+
+    return XYScreensFrames(
+        address=address_bytes,
+        **{
+            command: FRAME_PREFIX + address_bytes + bytes((opcode,))
+            for command, opcode in OPCODE_SETS[opcode_set].items()
+        },
+    )
+
+
+class XYScreensFrameParser:
+    """
+    Incremental parser of the frames in a byte stream.
+
+    Bytes are collected in a fixed buffer of one frame, anything before a frame prefix is
+    skipped. No memory is allocated per byte, only for every complete frame.
+
+    A frame prefix always starts a new frame, the bytes collected before it are the remains of a
+    truncated frame and are dropped. Frames with an unknown opcode are dropped as well, so the
+    parser resynchronises on the next frame prefix after noise or a lost byte. Frames for
+    addresses containing the prefix byte can therefore not be parsed.
+    """
+
+    __slots__ = ("_buffer", "_length")
+
+    def __init__(self) -> None:
+        """Initialize the parser."""
+        self._buffer = bytearray(FRAME_LENGTH)
+        self._length = 0
+
+    def feed(self, data: bytes) -> list[bytes]:
+        """Parse the received bytes, return the frames they complete."""
+        frames = []
+        buffer = self._buffer
+        length = self._length
+        prefix = FRAME_PREFIX[0]
+
+        for byte in data:
+            if byte == prefix:
+                length = 0
+            elif length == 0:
+                continue
+            buffer[length] = byte
+            length += 1
+            if length == FRAME_LENGTH:
+                if byte in OPCODES:
+                    frames.append(bytes(buffer))
+                length = 0
+
+        self._length = length
+        return frames
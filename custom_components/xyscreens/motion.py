@@ -0,0 +1,134 @@
+"""Position tracking of all moving XY Screens devices."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .screen import XYScreensBusScreen
+
+_LOGGER = logging.getLogger(__name__)
+
+# Interval in seconds at which moving screens report their progress, unless they ask for a
+# different one.
+PROGRESS_INTERVAL = 0.25
+# The shortest progress interval in seconds, that of the highest update rate that can be set.
+MIN_PROGRESS_INTERVAL = 0.1
+
+
+class XYScreensMotionScheduler:
+    """
+    Keeps the moves of all screens in one structure ordered by deadline.
+
+    A single timer fires at the earliest deadline and a single progress timer updates all moving
+    screens, the number of event loop wakeups does not grow with the number of moving screens.
+    The progress timer runs at the shortest progress interval of the moving screens. Positions in
+    between are calculated when they are read.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the scheduler."""
+        # Heap of (deadline, sequence number, screen) entries, entries of rescheduled or
+        # cancelled moves are left in the heap and skipped when they come up.
+        self._heap: list[tuple[float, int, XYScreensBusScreen]] = []
+        # The sequence number of the current entry of every moving screen.
+        self._moves: dict[XYScreensBusScreen, int] = {}
+        self._sequence = itertools.count()
+
+        self._deadline_timer: asyncio.TimerHandle | None = None
+        self._deadline_timer_at: float | None = None
+        self._progress_timer: asyncio.TimerHandle | None = None
+        self._progress_timer_interval = 0.0
+
+    @property
+    def moving(self) -> int:
+        """Return the number of screens being tracked."""
+        return len(self._moves)
+
+    def schedule(self, screen: XYScreensBusScreen, deadline: float) -> None:
+        """Schedule the end of the move of the screen at the given loop time."""
+        sequence = next(self._sequence)
+        self._moves[screen] = sequence
+        heapq.heappush(self._heap, (deadline, sequence, screen))
+
+        # Don't let the heap grow unbounded when moves get retargeted often.
+        if len(self._heap) > 2 * len(self._moves) + 16:
+            self._heap = [
+                entry for entry in self._heap if self._moves.get(entry[2]) == entry[1]
+            ]
+            heapq.heapify(self._heap)
+
+        self._arm()
+
+    def cancel(self, screen: XYScreensBusScreen) -> None:
+        """Stop tracking the move of the screen."""
+        if self._moves.pop(screen, None) is not None:
+            self._arm()
+
+    def _arm(self) -> None:
+        """(Re)arm the timers for the earliest deadline and the progress updates."""
+        loop = asyncio.get_running_loop()
+
+        # Drop the entries of rescheduled and cancelled moves from the top of the heap.
+        while self._heap and self._moves.get(self._heap[0][2]) != self._heap[0][1]:
+            heapq.heappop(self._heap)
+
+        deadline = self._heap[0][0] if self._heap else None
+        if deadline != self._deadline_timer_at:
+            if self._deadline_timer is not None:
+                self._deadline_timer.cancel()
+                self._deadline_timer = None
+            if deadline is not None:
+                self._deadline_timer = loop.call_at(deadline, self._deadline_reached)
+            self._deadline_timer_at = deadline
+
+        if self._moves:
+            interval = max(
+                min(screen.progress_interval for screen in self._moves),
+                MIN_PROGRESS_INTERVAL,
+            )
+            # A screen asking for more frequent updates started moving.
+            if (
+                self._progress_timer is not None
+                and interval < self._progress_timer_interval
+            ):
+                self._progress_timer.cancel()
+                self._progress_timer = None
+            if self._progress_timer is None:
+                self._progress_timer = loop.call_later(interval, self._progress)
+                self._progress_timer_interval = interval
+        elif self._progress_timer is not None:
+            self._progress_timer.cancel()
+            self._progress_timer = None
+
+    def _deadline_reached(self) -> None:
+        """Finish all moves of which the deadline has passed."""
+        self._deadline_timer = None
+        self._deadline_timer_at = None
+        now = asyncio.get_running_loop().time()
+
+        while self._heap and self._heap[0][0] <= now:
+            _, sequence, screen = heapq.heappop(self._heap)
+            if self._moves.get(screen) != sequence:
+                continue
+            del self._moves[screen]
+
+            try:
+                screen.target_reached()
+            except Exception:  # pylint: disable=broad-exception-caught
+                _LOGGER.exception("Exception while finishing move of %s", screen)
+
+        self._arm()
+
+    def _progress(self) -> None:
+        """Let all moving screens report their progress."""
+        self._progress_timer = None
+
+        for screen in list(self._moves):
+            screen.update_progress()
+
+        self._arm()
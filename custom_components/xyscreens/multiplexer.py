@@ -0,0 +1,91 @@
+"""Local TCP endpoint sharing the RS-485 bus with other tools."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from homeassistant.exceptions import HomeAssistantError
+
+from .bus import XYScreensBus
+from .frames import XYScreensFrameParser
+
+_LOGGER = logging.getLogger(__name__)
+
+# Only local tools can use the bus, the endpoint is not reachable from the network.
+MULTIPLEXER_HOST = "127.0.0.1"
+
+
+class XYScreensMultiplexer:
+    """
+    A TCP server on localhost through which other tools send frames over the bus.
+
+    A serial port can be opened by one process only, while the integration holds it other tools
+    send their raw 5 byte frames to this server instead. The frames are written over the bus like
+    the commands of the integration, and update the assumed state of the devices they address.
+    """
+
+    _server: asyncio.Server | None = None
+
+    def __init__(self, bus: XYScreensBus, port: int) -> None:
+        """Initialize the multiplexer."""
+        self._bus = bus
+        self._port = port
+        self._clients: set[asyncio.Task] = set()
+
+    async def async_start(self) -> None:
+        """Start accepting clients."""
+        self._server = await asyncio.start_server(
+            self._async_handle_client, MULTIPLEXER_HOST, self._port
+        )
+        _LOGGER.debug(
+            "Sharing bus %s on %s:%d",
+            self._bus.connection_string,
+            MULTIPLEXER_HOST,
+            self._port,
+        )
+
+    async def async_stop(self) -> None:
+        """Stop the server and disconnect all clients."""
+        if self._server is not None:
+            self._server.close()
+
+        for task in list(self._clients):
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _async_handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        peer = writer.get_extra_info("peername")
+        _LOGGER.debug("Client %s connected to bus %s", peer, self._bus.connection_string)
+
+        task = asyncio.current_task()
+        self._clients.add(task)
+
+        parser = XYScreensFrameParser()
+        try:
+            while data := await reader.read(256):
+                for frame in parser.feed(data):
+                    try:
+                        await self._bus.async_write_external(frame)
+                    except (HomeAssistantError, OSError) as ex:
+                        _LOGGER.warning(
+                            "Failed to send frame 0x%s of client %s: %s",
+                            frame.hex(),
+                            peer,
+                            ex,
+                        )
+        except OSError as ex:
+            _LOGGER.debug("Client %s lost its connection: %s", peer, ex)
+        finally:
+            self._clients.discard(task)
+            writer.close()
+            _LOGGER.debug("Client %s disconnected", peer)
@@ -0,0 +1,174 @@
+"""Recorder of the traffic on an RS-485 bus."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import struct
+import time
+from datetime import timedelta
+from typing import BinaryIO, NamedTuple
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .frames import FRAME_LENGTH
+
+_LOGGER = logging.getLogger(__name__)
+
+# The file starts with a header identifying the format, followed by a ring of fixed size records.
+HEADER = struct.Struct("<4sHHI")
+MAGIC = b"XYSR"
+FORMAT_VERSION = 2
+
+# Sequence number, time.monotonic_ns() time, direction, device address and opcode.
+RECORD = struct.Struct("<IqB3sB3x")
+
+DIRECTION_SENT = 0
+DIRECTION_RECEIVED = 1
+# Marks the start of a recording session, with the time.time_ns() wall clock time instead of the
+# monotonic time. The monotonic times after it are unrelated to those before it, the monotonic
+# clock restarts with the system.
+DIRECTION_SESSION = 2
+
+# The maximum size of a recording file, the oldest records are overwritten when it is full.
+MAX_FILE_SIZE = 1024 * 1024
+
+# Records are kept in memory and written to the file at this interval.
+FLUSH_INTERVAL = timedelta(seconds=5)
+
+
+class Record(NamedTuple):
+    """A frame on the bus, or the start of a recording session."""
+
+    sequence: int
+    timestamp: int
+    direction: int
+    address: bytes
+    opcode: int
+
+
+def read_recording(path: str) -> list[Record]:
+    """Return the records of a recording file, oldest first."""
+    with open(path, "rb") as file:
+        magic, version, record_size, capacity = HEADER.unpack(file.read(HEADER.size))
+        if magic != MAGIC or version != FORMAT_VERSION or record_size != RECORD.size:
+            raise ValueError(f"{path} is not a recording of this version")
+
+        data = file.read(capacity * RECORD.size)
+
+    records = [
+        Record(*record)
+        for record in RECORD.iter_unpack(data[: len(data) // RECORD.size * RECORD.size])
+    ]
+    # Unused slots have sequence number 0.
+    return sorted(
+        (record for record in records if record.sequence > 0),
+        key=lambda record: record.sequence,
+    )
+
+
+class XYScreensRecorder:
+    """
+    Record every frame sent or received on a bus into a size-capped ring file.
+
+    Recording a frame only appends it to a list, the records are written to the file in the
+    executor every FLUSH_INTERVAL. Every recorder starts a new session in the file.
+    """
+
+    _file: BinaryIO | None = None
+    _unsub_flush: CALLBACK_TYPE | None = None
+
+    def __init__(self, path: str, max_size: int = MAX_FILE_SIZE) -> None:
+        """Initialize the recorder."""
+        self.path = path
+        self._capacity = (max_size - HEADER.size) // RECORD.size
+        self._sequence = 1
+        self._pending: list[tuple[int, int, int, bytes, int]] = [
+            (1, time.time_ns(), DIRECTION_SESSION, bytes(3), 0)
+        ]
+        # Only one flush writes to the file at a time.
+        self._lock = asyncio.Lock()
+
+    def record(self, direction: int, frames: bytes) -> None:
+        """Record one or more joined frames."""
+        timestamp = time.monotonic_ns()
+        for offset in range(0, len(frames) - FRAME_LENGTH + 1, FRAME_LENGTH):
+            self._sequence += 1
+            self._pending.append(
+                (
+                    self._sequence,
+                    timestamp,
+                    direction,
+                    frames[offset + 1 : offset + 4],
+                    frames[offset + 4],
+                )
+            )
+
+    def _open(self) -> None:
+        """Open the recording, continuing after its newest record."""
+        if os.path.exists(self.path):
+            try:
+                records = read_recording(self.path)
+            except (OSError, ValueError, struct.error) as ex:
+                _LOGGER.warning("Starting a new recording %s: %s", self.path, ex)
+            else:
+                self._file = open(self.path, "r+b")  # pylint: disable=consider-using-with
+                self._capacity = HEADER.unpack(self._file.read(HEADER.size))[3]
+                self._sequence = records[-1].sequence if records else 0
+                return
+
+        self._file = open(self.path, "w+b")  # pylint: disable=consider-using-with
+        self._file.write(HEADER.pack(MAGIC, FORMAT_VERSION, RECORD.size, self._capacity))
+        self._sequence = 0
+
+    def _write(self, records: list[tuple[int, int, int, bytes, int]]) -> None:
+        """Write the records to their slots in the ring."""
+        for record in records:
+            self._file.seek(HEADER.size + (record[0] - 1) % self._capacity * RECORD.size)
+            self._file.write(RECORD.pack(*record))
+        self._file.flush()
+
+    def _close(self) -> None:
+        self._file.close()
+        self._file = None
+
+    async def async_start(self, hass: HomeAssistant) -> None:
+        """Open the recording and start writing the records periodically."""
+        await hass.async_add_executor_job(self._open)
+        # Records made before the file was opened continue its sequence.
+        self._pending = [
+            (self._sequence + index + 1, *record[1:])
+            for index, record in enumerate(self._pending)
+        ]
+        self._sequence += len(self._pending)
+
+        @callback
+        def _async_flush(_now) -> None:
+            hass.async_create_background_task(
+                self.async_flush(hass), "xyscreens recorder flush"
+            )
+
+        self._unsub_flush = async_track_time_interval(hass, _async_flush, FLUSH_INTERVAL)
+        _LOGGER.debug("Recording to %s", self.path)
+
+    async def async_flush(self, hass: HomeAssistant) -> None:
+        """Write the pending records to the file."""
+        async with self._lock:
+            if not self._pending or self._file is None:
+                return
+
+            records, self._pending = self._pending, []
+            await hass.async_add_executor_job(self._write, records)
+
+    async def async_stop(self, hass: HomeAssistant) -> None:
+        """Write the last records and close the recording."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+
+        await self.async_flush(hass)
+        async with self._lock:
+            if self._file is not None:
+                await hass.async_add_executor_job(self._close)
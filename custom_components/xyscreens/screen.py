@@ -0,0 +1,473 @@
+"""XY Screens device sending its commands over a shared bus."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable
+from enum import IntEnum
+
+from homeassistant.exceptions import HomeAssistantError
+
+from .bus import XYScreensBus
+from .frames import XYScreensFrames
+from .motion import PROGRESS_INTERVAL, XYScreensMotionScheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+# Smoothing factor of the moving average of the offset of the stops at a target position.
+STOP_OFFSET_SMOOTHING = 0.2
+
+
+class XYScreensState(IntEnum):
+    """The states of a screen."""
+
+    # Standing still anywhere between up and down.
+    STOPPED = 0
+    # Standing still, fully retracted to the highest position.
+    UP = 1
+    # Moving upwards.
+    UPWARD = 2
+    # Moving downwards.
+    DOWNWARD = 3
+    # Standing still, fully extended to the lowest position.
+    DOWN = 4
+
+
+class XYScreensBusScreen:
+    """
+    An XY Screens device that sends its commands over a shared bus.
+
+    The devices don't report their state, the state and position are assumed from the commands
+    sent and the durations of a full move. The commands go over the long-lived connection of the
+    bus and are taken from the prebuilt frames of the device address. Moves are tracked by the
+    shared motion scheduler instead of a polling task per screen.
+    """
+
+    def __init__(
+        self,
+        bus: XYScreensBus,
+        motion: XYScreensMotionScheduler,
+        frames: XYScreensFrames,
+        down_duration: float,
+        up_duration: float | None = None,
+    ) -> None:
+        """Initialize the screen."""
+        assert down_duration > 0.0
+        assert up_duration is None or up_duration > 0.0
+
+        self._bus = bus
+        self._motion = motion
+        self._commands = frames
+
+        # The durations in seconds of a full move down and up.
+        self._down_duration = down_duration
+        self._up_duration = up_duration if up_duration is not None else down_duration
+
+        # The assumed state and position, 0.0 is fully up and 100.0 is fully down. While moving
+        # the position is that at the loop time it was last updated.
+        self._state = XYScreensState.UP
+        self._position = 0.0
+        self._updated_at = 0.0
+
+        # The position the screen is currently moving to.
+        self._target_position: float | None = None
+        # Seconds between the progress reports of a move, the motion scheduler reports the progress
+        # of all moving screens at the shortest interval of them.
+        self.progress_interval = PROGRESS_INTERVAL
+        # The task sending the stop command when the target position is reached.
+        self._stop_task: asyncio.Task | None = None
+        # The average distance in percent the screen moved past its target position when it was
+        # stopped, negative when it stopped short.
+        self._stop_offset = 0.0
+
+        self._callbacks: list[Callable[[XYScreensState, float], None]] = []
+
+    @property
+    def bus(self) -> XYScreensBus:
+        """Return the bus the screen is connected to."""
+        return self._bus
+
+    @property
+    def address(self) -> bytes:
+        """Return the device address."""
+        return self._commands.address
+
+    @property
+    def position_error(self) -> float:
+        """
+        Return the expected error of a partial position, in percent.
+
+        This is the average offset of the stops at a target position, plus the variation of the
+        bus write latency expressed as screen travel.
+        """
+        return abs(self._stop_offset) + (
+            self._bus.write_jitter
+            * 100
+            / min(self._up_duration, self._down_duration)
+        )
+
+    @property
+    def moving(self) -> bool:
+        """Return True if the screen is moving."""
+        return self._state in (XYScreensState.UPWARD, XYScreensState.DOWNWARD)
+
+    def add_callback(self, callback: Callable[[XYScreensState, float], None]) -> None:
+        """Add a callback that is called whenever the state or position changes."""
+        self._callbacks.append(callback)
+
+    def _update_callbacks(self) -> None:
+        for callback in self._callbacks:
+            try:
+                callback(self._state, self._position)
+            except Exception:  # pylint: disable=broad-exception-caught
+                _LOGGER.exception("Exception in callback %s", callback)
+
+    def restore_position(self, position: float) -> None:
+        """Restore the position of the screen after a restart, it is assumed to stand still."""
+        assert 0.0 <= position <= 100.0
+
+        self._position = position
+        if position == 0.0:
+            self._state = XYScreensState.UP
+        elif position == 100.0:
+            self._state = XYScreensState.DOWN
+        else:
+            self._state = XYScreensState.STOPPED
+
+    def _update(self, now: float | None = None) -> None:
+        """Bring the position of a moving screen up to date, or to the given loop time."""
+        if self._state == XYScreensState.DOWNWARD:
+            direction = 1.0
+            duration = self._down_duration
+        elif self._state == XYScreensState.UPWARD:
+            direction = -1.0
+            duration = self._up_duration
+        else:
+            return
+
+        if now is None:
+            now = asyncio.get_running_loop().time()
+        if now <= self._updated_at:
+            # The command that started the move is still on the wire.
+            return
+
+        position = self._position + direction * (now - self._updated_at) * 100 / duration
+        self._updated_at = now
+
+        # The screen stops by itself at the end of its travel.
+        if position >= 100.0:
+            self._state = XYScreensState.DOWN
+            position = 100.0
+        elif position <= 0.0:
+            self._state = XYScreensState.UP
+            position = 0.0
+
+        self._position = position
+
+    def state(self) -> XYScreensState:
+        """Return the current state of the screen."""
+        self._update()
+        return self._state
+
+    def position(self) -> float:
+        """Return the current position, 0.0 is fully up and 100.0 is fully down."""
+        self._update()
+        return self._position
+
+    def _post_up(self, started_at: float) -> None:
+        """Update the state after the up command has left the wire at the given loop time."""
+        if self._state in (XYScreensState.UPWARD, XYScreensState.UP):
+            return
+
+        self._update(started_at)
+        self._state = XYScreensState.UPWARD
+        self._updated_at = started_at
+
+    def _post_down(self, started_at: float) -> None:
+        """Update the state after the down command has left the wire at the given loop time."""
+        if self._state in (XYScreensState.DOWNWARD, XYScreensState.DOWN):
+            return
+
+        self._update(started_at)
+        self._state = XYScreensState.DOWNWARD
+        self._updated_at = started_at
+
+    def _post_stop(self, stopped_at: float) -> None:
+        """Update the state after the stop command has left the wire at the given loop time."""
+        if not self.moving:
+            return
+
+        self._update(stopped_at)
+        if self.moving:
+            self._state = XYScreensState.STOPPED
+
+    def _post_command(self, command: bytes, sent_at: float) -> None:
+        """Update the state after a command has left the wire at the given loop time."""
+        if command == self._commands.down:
+            self._post_down(sent_at)
+        elif command == self._commands.up:
+            self._post_up(sent_at)
+        elif command == self._commands.stop:
+            self._post_stop(sent_at)
+
+    def _schedule_target(self) -> None:
+        """
+        Schedule the moment the screen reaches its target position.
+
+        The position is that at the last update, which is when the command that started the move
+        left the wire if that is later than now.
+        """
+        if self._state == XYScreensState.DOWNWARD:
+            travel_time = (
+                (self._target_position - self._position) * self._down_duration / 100
+            )
+        elif self._state == XYScreensState.UPWARD:
+            travel_time = (
+                (self._position - self._target_position) * self._up_duration / 100
+            )
+        else:
+            self._motion.cancel(self)
+            return
+
+        if self._target_position not in (0.0, 100.0):
+            # Send the stop command early enough for it to arrive in time.
+            travel_time -= self._bus.write_latency
+
+        self._motion.schedule(
+            self,
+            max(self._updated_at + travel_time, asyncio.get_running_loop().time()),
+        )
+
+    def set_durations(
+        self, down_duration: float, up_duration: float | None = None
+    ) -> None:
+        """
+        Change the durations of a full move, keeping the current position.
+
+        A move in progress continues from the position reached so far at the new speed.
+        """
+        assert down_duration > 0.0
+        assert up_duration is None or up_duration > 0.0
+
+        self._update()
+        self._down_duration = down_duration
+        self._up_duration = up_duration if up_duration is not None else down_duration
+
+        if self.moving and self._target_position is not None:
+            self._schedule_target()
+
+    def target_reached(self) -> None:
+        """Called by the motion scheduler when the screen reaches its target position."""
+        if self._target_position in (0.0, 100.0):
+            # The screen stops by itself at the end of its travel.
+            self._position = self._target_position
+            if self._target_position == 0.0:
+                self._state = XYScreensState.UP
+            else:
+                self._state = XYScreensState.DOWN
+            self._update_callbacks()
+            return
+
+        self._stop_task = asyncio.create_task(self._async_stop_at_target())
+
+    async def _async_stop_at_target(self) -> None:
+        target_position = self._target_position
+        direction = 1.0 if self._state == XYScreensState.DOWNWARD else -1.0
+
+        try:
+            stopped_at = await self._async_send_command(self._commands.stop)
+        except (HomeAssistantError, OSError) as ex:
+            # The screen keeps moving until the end of its travel.
+            _LOGGER.error("Failed to stop at target position: %s", ex)
+            self._update()
+            self._target_position = (
+                100.0 if self._state == XYScreensState.DOWNWARD else 0.0
+            )
+            self._schedule_target()
+            return
+
+        if stopped_at is None:
+            # A newer command for the screen replaced the stop command.
+            return
+
+        self._post_stop(stopped_at)
+        if self._state == XYScreensState.STOPPED:
+            offset = direction * (self._position - target_position)
+            self._stop_offset += STOP_OFFSET_SMOOTHING * (offset - self._stop_offset)
+        self._update_callbacks()
+
+    def update_progress(self) -> None:
+        """Called by the motion scheduler to report the progress of the move."""
+        self._update()
+        self._update_callbacks()
+
+    async def _cancel_set_position(self) -> None:
+        """Stop tracking the move in progress, the screen keeps moving."""
+        self._motion.cancel(self)
+        if self._stop_task is not None and not self._stop_task.done():
+            self._stop_task.cancel()
+        self._stop_task = None
+
+        self._update()
+        self._update_callbacks()
+
+    def handle_frame(self, frame: bytes) -> None:
+        """
+        Update the assumed state for a frame sent by another controller.
+
+        An up or down command moves the screen to the end of its travel, a stop command stops it
+        where it is.
+        """
+        if frame == self._commands.down:
+            target_position = 100.0
+        elif frame == self._commands.up:
+            target_position = 0.0
+        elif frame == self._commands.stop:
+            target_position = None
+        else:
+            return
+
+        _LOGGER.debug("Received frame 0x%s from another controller", frame.hex())
+
+        self._motion.cancel(self)
+        if self._stop_task is not None and not self._stop_task.done():
+            self._stop_task.cancel()
+        self._stop_task = None
+
+        self._post_command(frame, asyncio.get_running_loop().time())
+
+        self._target_position = target_position
+        self._schedule_target()
+        self._update_callbacks()
+
+    def _group_command(self, target_position: float | None) -> bytes | None:
+        """Return the frame needed to move the screen towards the target position."""
+        if target_position is None or round(self._position) == round(target_position):
+            return self._commands.stop if self.moving else None
+        if self._position < target_position:
+            return self._commands.down
+        return self._commands.up
+
+    def _start_group_move(
+        self, command: bytes, target_position: float | None, sent_at: float
+    ) -> None:
+        """Update the state after the group frame has been sent and start tracking the position."""
+        self._post_command(command, sent_at)
+
+        self._target_position = target_position
+        self._schedule_target()
+        self._update_callbacks()
+
+    async def async_up(self) -> bool:
+        """Move the screen up."""
+        return await self.async_set_position(0.0)
+
+    async def async_down(self) -> bool:
+        """Move the screen down."""
+        return await self.async_set_position(100.0)
+
+    async def async_stop(self) -> bool:
+        """Stop the screen."""
+        await self._cancel_set_position()
+
+        if (stopped_at := await self._async_send_command(self._commands.stop)) is None:
+            return False
+
+        # A move that was retargeted while the stop command was queued has stopped as well.
+        self._motion.cancel(self)
+        self._target_position = None
+
+        self._post_stop(stopped_at)
+        self._update_callbacks()
+
+        return True
+
+    def can_retarget(self, target_position: float) -> bool:
+        """Return True if the move in progress can be retargeted to the position."""
+        self._update()
+        return (
+            self._state == XYScreensState.DOWNWARD and target_position > self._position
+        ) or (self._state == XYScreensState.UPWARD and target_position < self._position)
+
+    async def async_set_position(self, target_position: float) -> bool:
+        """
+        Move the screen to a given position.
+
+        If the screen is already moving towards the target position the move in progress is
+        retargeted, without sending a new command or restarting the motor.
+        """
+        assert 0.0 <= target_position <= 100.0
+
+        if self.can_retarget(target_position):
+            _LOGGER.debug("Retargeting move to %5.1f %%", target_position)
+            self._target_position = target_position
+            self._schedule_target()
+            return True
+
+        if round(self._position) == round(target_position):
+            return await self.async_stop()
+
+        await self._cancel_set_position()
+
+        if self._position < target_position:
+            command = self._commands.down
+        else:
+            command = self._commands.up
+
+        if (started_at := await self._async_send_command(command)) is None:
+            return False
+        self._post_command(command, started_at)
+
+        self._target_position = target_position
+        self._schedule_target()
+        self._update_callbacks()
+
+        return True
+
+    async def async_shutdown(self) -> None:
+        """Stop tracking the position, the bus might be closed after this."""
+        self._motion.cancel(self)
+        if self._stop_task is not None:
+            self._stop_task.cancel()
+            self._stop_task = None
+
+    async def _async_send_command(self, command: bytes) -> float | None:
+        """
+        Send a command and return the loop time at which it has left the wire.
+
+        Return None if a newer command replaced it before it was sent.
+        """
+        return await self._bus.async_write(command)
+
+
+async def async_move_group(
+    moves: list[tuple[XYScreensBusScreen, float | None]],
+) -> None:
+    """
+    Move several screens at the same time.
+
+    A target position of None stops the screen. The frames for all screens on the same bus are
+    written in one go.
+    """
+    # pylint: disable=protected-access
+    for screen, _ in moves:
+        await screen._cancel_set_position()
+
+    batches: dict[XYScreensBus, list[tuple[XYScreensBusScreen, float | None, bytes]]] = {}
+    for screen, target_position in moves:
+        if (frame := screen._group_command(target_position)) is not None:
+            batches.setdefault(screen.bus, []).append((screen, target_position, frame))
+
+    results = await asyncio.gather(
+        *(
+            bus.async_write_batch([frame for _, _, frame in batch])
+            for bus, batch in batches.items()
+        )
+    )
+
+    # Every screen starts moving when its own frame has left the wire.
+    for batch, sent_at in zip(batches.values(), results):
+        for (screen, target_position, frame), frame_sent_at in zip(batch, sent_at):
+            if frame_sent_at is not None:
+                screen._start_group_move(frame, target_position, frame_sent_at)
@@ -0,0 +1,185 @@
+"""The XY Screens bus health sensor entities."""
+
+from __future__ import annotations
+
+import collections
+import logging
+import time
+from datetime import timedelta
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import (
+    CoordinatorEntity,
+    DataUpdateCoordinator,
+)
+
+from .bus import LATENCY_BUCKETS, XYScreensBus, get_connection_string
+from .const import DATA_BUSES, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# The sensors are published at a fixed low rate, not on every frame.
+UPDATE_INTERVAL = timedelta(seconds=60)
+
+# The period the reconnects are counted over.
+RECONNECT_WINDOW = 3600
+
+SENSORS: tuple[SensorEntityDescription, ...] = (
+    SensorEntityDescription(
+        key="latency_p50",
+        translation_key="latency_p50",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key="latency_p95",
+        translation_key="latency_p95",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key="reconnects_per_hour",
+        translation_key="reconnects_per_hour",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key="queue_depth",
+        translation_key="queue_depth",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+)
+
+
+def _latency_percentile(histogram: list[int], fraction: float) -> float | None:
+    """
+    Return the percentile of a latency histogram in milliseconds.
+
+    The percentile is the upper bound of the bucket it falls in, the last bucket has no upper
+    bound and reports the bound of the bucket before it.
+    """
+    total = sum(histogram)
+    if total == 0:
+        return None
+
+    count = 0
+    for bound, bucket in zip(LATENCY_BUCKETS, histogram):
+        count += bucket
+        if count >= total * fraction:
+            return bound * 1000
+
+    return LATENCY_BUCKETS[-1] * 1000
+
+
+class XYScreensBusHealthCoordinator(DataUpdateCoordinator[dict[str, float | None]]):
+    """
+    Sample the counters of a bus at a fixed rate.
+
+    The latency percentiles are calculated over the frames written since the previous sample
+    and keep their value when nothing was written. Nothing is sampled while all sensors are
+    disabled.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, config_entry: ConfigEntry, bus: XYScreensBus
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=config_entry,
+            name=f"XY Screens bus {bus.connection_string}",
+            update_interval=UPDATE_INTERVAL,
+        )
+        self._bus = bus
+        self._histogram = list(bus.latency_histogram)
+        # Samples of the number of lost connections, covering the reconnect window.
+        self._losses: collections.deque[tuple[float, int]] = collections.deque(
+            maxlen=int(RECONNECT_WINDOW / UPDATE_INTERVAL.total_seconds()) + 1
+        )
+        self._latency: tuple[float | None, float | None] = (None, None)
+
+    async def _async_update_data(self) -> dict[str, float | None]:
+        bus = self._bus
+
+        histogram = [
+            count - previous
+            for count, previous in zip(bus.latency_histogram, self._histogram)
+        ]
+        self._histogram = list(bus.latency_histogram)
+        if any(histogram):
+            self._latency = (
+                _latency_percentile(histogram, 0.5),
+                _latency_percentile(histogram, 0.95),
+            )
+
+        self._losses.append((time.monotonic(), bus.connection_losses))
+
+        return {
+            "latency_p50": self._latency[0],
+            "latency_p95": self._latency[1],
+            "reconnects_per_hour": self._losses[-1][1] - self._losses[0][1],
+            "queue_depth": bus.queue_depth,
+        }
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the health sensors of the bus."""
+    bus = hass.data[DOMAIN][DATA_BUSES][get_connection_string(config_entry.data)]
+    coordinator = XYScreensBusHealthCoordinator(hass, config_entry, bus)
+    await coordinator.async_config_entry_first_refresh()
+
+    async_add_entities(
+        XYScreensBusSensor(coordinator, config_entry, description)
+        for description in SENSORS
+    )
+
+
+class XYScreensBusSensor(CoordinatorEntity[XYScreensBusHealthCoordinator], SensorEntity):
+    """A health sensor of the bus."""
+
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: XYScreensBusHealthCoordinator,
+        config_entry: ConfigEntry,
+        description: SensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{config_entry.entry_id}_{description.key}"
+        # The bus is a device of its own, the screens and lifts on it are separate devices.
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, config_entry.entry_id)},
+            name=config_entry.title,
+        )
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the latest sample."""
+        return self.coordinator.data[self.entity_description.key]
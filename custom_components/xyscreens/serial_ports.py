@@ -0,0 +1,87 @@
+"""Cached discovery of the serial ports for the XY Screens config flow."""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_SERIAL_PORTS, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+BY_ID_DIR = "/dev/serial/by-id"
+
+
+class XYScreensSerialPorts:
+    """
+    The serial ports of the system, with their stable /dev/serial/by-id paths.
+
+    Listing the ports and resolving the by-id symlinks takes a while on hosts with many USB serial
+    devices. Both are done together and cached until the modification time of the by-id directory
+    changes, which happens when a USB serial device is plugged in or removed.
+
+    The methods do blocking I/O and should be run in the executor.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the cache."""
+        self._loaded = False
+        self._mtime: int | None = None
+        self._ports: list[Any] = []
+        # The by-id path of every device with one, by the real path of the device.
+        self._by_id: dict[str, str] = {}
+
+    def _refresh(self) -> None:
+        """Discover the serial ports again if the by-id directory has changed."""
+        try:
+            mtime = os.stat(BY_ID_DIR).st_mtime_ns
+        except OSError:
+            # There is no by-id directory without USB serial devices.
+            mtime = None
+
+        if self._loaded and mtime == self._mtime:
+            return
+
+        # The serial stack is only imported when a serial port is configured.
+        # pylint: disable=import-outside-toplevel
+        from serial.tools import list_ports
+
+        start = time.monotonic()
+
+        by_id = {}
+        if mtime is not None:
+            for entry in os.scandir(BY_ID_DIR):
+                if entry.is_symlink():
+                    by_id[os.path.realpath(entry.path)] = entry.path
+
+        self._ports = list_ports.comports()
+        self._by_id = by_id
+        self._mtime = mtime
+        self._loaded = True
+
+        _LOGGER.debug(
+            "Discovered %d serial port(s) in %.1f ms",
+            len(self._ports),
+            (time.monotonic() - start) * 1000,
+        )
+
+    def get_ports(self) -> list[Any]:
+        """Return the serial ports, as ListPortInfo of pySerial."""
+        self._refresh()
+        return self._ports
+
+    def get_serial_by_id(self, dev_path: str) -> str:
+        """Return a /dev/serial/by-id match for given device if available."""
+        self._refresh()
+        return self._by_id.get(dev_path, dev_path)
+
+
+def get_serial_ports(hass: HomeAssistant) -> XYScreensSerialPorts:
+    """Return the serial port cache shared by all config flows."""
+    return hass.data.setdefault(DOMAIN, {}).setdefault(
+        DATA_SERIAL_PORTS, XYScreensSerialPorts()
+    )
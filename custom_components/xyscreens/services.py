@@ -0,0 +1,67 @@
+"""Services for the XY Screens integration."""
+
+from __future__ import annotations
+
+import voluptuous as vol
+from homeassistant.components.cover import ATTR_POSITION
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.service import async_extract_entity_ids
+
+from .const import (
+    ATTR_COMMAND,
+    COMMAND_CLOSE,
+    COMMAND_OPEN,
+    COMMAND_STOP,
+    DATA_COVERS,
+    DOMAIN,
+    SERVICE_MOVE_GROUP,
+)
+from .screen import async_move_group
+
+MOVE_GROUP_SCHEMA = vol.All(
+    cv.make_entity_service_schema(
+        {
+            vol.Exclusive(ATTR_COMMAND, "move"): vol.In(
+                [COMMAND_OPEN, COMMAND_CLOSE, COMMAND_STOP]
+            ),
+            vol.Exclusive(ATTR_POSITION, "move"): vol.All(
+                vol.Coerce(int), vol.Range(min=0, max=100)
+            ),
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_COMMAND, ATTR_POSITION),
+)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the XY Screens services."""
+
+    async def async_move_group_service(call: ServiceCall) -> None:
+        """Move all given covers at the same time."""
+        covers = hass.data.get(DOMAIN, {}).get(DATA_COVERS, {})
+
+        moves = []
+        for entity_id in await async_extract_entity_ids(hass, call):
+            if (cover := covers.get(entity_id)) is None:
+                raise ServiceValidationError(
+                    f"{entity_id} is not an XY Screens cover"
+                )
+
+            if (command := call.data.get(ATTR_COMMAND)) == COMMAND_STOP:
+                moves.append((cover.screen, None))
+            elif command == COMMAND_OPEN:
+                moves.append((cover.screen, cover.screen_position(100)))
+            elif command == COMMAND_CLOSE:
+                moves.append((cover.screen, cover.screen_position(0)))
+            else:
+                moves.append(
+                    (cover.screen, cover.screen_position(call.data[ATTR_POSITION]))
+                )
+
+        await async_move_group(moves)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_MOVE_GROUP, async_move_group_service, schema=MOVE_GROUP_SCHEMA
+    )
@@ -0,0 +1,97 @@
+"""Persistent positions of all XY Screens devices."""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from .screen import XYScreensState
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.positions"
+STORAGE_VERSION = 1
+
+# Seconds changes are collected before the positions of all devices are written at once.
+SAVE_DELAY = 1.0
+
+# The positions moving devices end at, by the name of their state.
+END_POSITIONS = {"DOWNWARD": 100.0, "UPWARD": 0.0}
+
+
+class XYScreensPositionStore:
+    """
+    Keeps the position, state and time of the last change of every device in one file.
+
+    The file is read once when the integration is set up, and written with a short delay after
+    changes, so it is up to date even when Home Assistant does not shut down cleanly. Only the
+    start and end of a move are saved, the positions in between follow from them.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the store."""
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY, atomic_writes=True
+        )
+        self._devices: dict[str, dict[str, Any]] = {}
+
+    async def async_load(self) -> None:
+        """Read the positions of all devices."""
+        if (data := await self._store.async_load()) is not None:
+            self._devices = data
+        _LOGGER.debug("Loaded the positions of %d devices", len(self._devices))
+
+    @callback
+    def get_position(self, device_id: str) -> float | None:
+        """
+        Return the last position of a device, None if it is unknown.
+
+        A device that was moving when the position was saved has not been stopped by Home
+        Assistant, and has run to the end of its move.
+        """
+        if (device := self._devices.get(device_id)) is None:
+            return None
+
+        return END_POSITIONS.get(device["state"], device["position"])
+
+    @callback
+    def async_update(
+        self, device_id: str, state: XYScreensState, position: float
+    ) -> None:
+        """Save the state and position of a device."""
+        device = self._devices.get(device_id)
+        if device is not None and device["state"] == state.name:
+            if state.name in END_POSITIONS:
+                # Still moving, the saved start of the move remains valid.
+                return
+            if device["position"] == round(position, 1):
+                return
+
+        self._devices[device_id] = {
+            "state": state.name,
+            "position": round(position, 1),
+            "timestamp": dt_util.utcnow().isoformat(),
+        }
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def async_remove(self, device_ids: Iterable[str]) -> None:
+        """Forget the positions of removed devices."""
+        removed = False
+        for device_id in device_ids:
+            removed |= self._devices.pop(device_id, None) is not None
+
+        if removed:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, dict[str, Any]]:
+        return self._devices
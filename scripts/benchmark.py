@@ -0,0 +1,347 @@
+"""
+Benchmarks of the XY Screens integration against the bus simulator.
+
+Measures the latency from a cover command to its frame arriving on the bus, the number of frames
+per second a bus handles with many devices, how long the event loop is blocked while a serial port
+is tested, how long the setup of a bus with 1, 10 and 50 devices takes and how long importing the
+integration takes. The results are written as JSON, so they can be compared between versions.
+
+Home Assistant runs in-process with the test helpers of pytest-homeassistant-custom-component,
+which has to be installed. Serial ports are simulated with a pseudo terminal, which requires Linux
+or macOS.
+
+Usage:
+    python scripts/benchmark.py [--iterations 50] [--output results.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import Any
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# pylint: disable=wrong-import-position
+from homeassistant import loader
+from homeassistant.const import __version__ as HA_VERSION
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from simulator import BusSimulator
+
+# The test helpers configure Home Assistant with a custom_components package of their own, which
+# would hide the integration. Importing it first makes the loader use this repository instead.
+import custom_components.xyscreens  # noqa: F401 pylint: disable=unused-import,wrong-import-order
+
+DOMAIN = "xyscreens"
+
+# The number of devices the bus throughput is measured with.
+THROUGHPUT_DEVICES = 10
+SETUP_DEVICES = (1, 10, 50)
+
+# Modules Home Assistant has already imported when it loads the integration.
+PRELOADED_MODULES = (
+    "homeassistant.components.cover",
+    "homeassistant.components.sensor",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.config_validation",
+)
+IMPORTED_MODULES = ("custom_components.xyscreens", "custom_components.xyscreens.config_flow")
+
+
+def _address(index: int) -> str:
+    return f"aa{index:04x}"
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    """Return the statistics of the samples in milliseconds."""
+    samples = sorted(samples)
+    if len(samples) > 1:
+        # Interpolated between the samples, like the 50th percentile is the median.
+        quantiles = statistics.quantiles(samples, n=100, method="inclusive")
+        p50, p95 = quantiles[49], quantiles[94]
+    else:
+        p50 = p95 = samples[0]
+
+    if not samples[0] <= p50 <= p95 <= samples[-1]:
+        raise ValueError(f"Percentiles out of order: {p50} {p95} {samples}")
+
+    return {
+        "min_ms": round(samples[0] * 1000, 3),
+        "p50_ms": round(p50 * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3),
+    }
+
+
+@asynccontextmanager
+async def _async_home_assistant():
+    """Run a Home Assistant instance with the integration of this repository."""
+    async with async_test_home_assistant() as hass:
+        # Load custom integrations from the repository instead of the test config.
+        hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+        yield hass
+        await hass.async_stop(force=True)
+
+
+async def _async_setup_bus(
+    hass: HomeAssistant, data: dict[str, Any], devices: int
+) -> MockConfigEntry:
+    """Add and set up a bus entry with the given number of devices."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=4,
+        minor_version=1,
+        unique_id=str(data),
+        title="Benchmark",
+        data=data,
+        subentries_data=[
+            {
+                "data": {
+                    "address": _address(index),
+                    "device_type": "projector_screen",
+                    "time_open": 10,
+                    "time_close": 10,
+                    "inverted": False,
+                    "position_debounce": 0,
+                    "update_rate": 0,
+                },
+                "subentry_type": "device",
+                "title": _address(index).upper(),
+                "unique_id": _address(index),
+            }
+            for index in range(devices)
+        ],
+    )
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    return entry
+
+
+def _entity_ids(hass: HomeAssistant) -> list[str]:
+    """Return the entity ids of the covers."""
+    return sorted(hass.data[DOMAIN]["covers"])
+
+
+async def async_benchmark_latency(iterations: int) -> dict[str, Any]:
+    """Measure the time from a cover command until its frame has arrived on the bus."""
+    simulator = BusSimulator()
+    port = await simulator.start_tcp()
+
+    samples = []
+    async with _async_home_assistant() as hass:
+        entry = await _async_setup_bus(
+            hass, {"connection_type": "network", "host": "127.0.0.1", "port": port}, 1
+        )
+        entity_id = _entity_ids(hass)[0]
+
+        for iteration in range(iterations):
+            service = "close_cover" if iteration % 2 == 0 else "open_cover"
+            frame = asyncio.ensure_future(simulator.wait_for_frame())
+            start = time.monotonic()
+            await hass.services.async_call(
+                "cover", service, {"entity_id": entity_id}, blocking=False
+            )
+            received_at, _ = await frame
+            samples.append(received_at - start)
+
+            # Give the bus time to become idle.
+            await asyncio.sleep(0.05)
+
+        await hass.config_entries.async_unload(entry.entry_id)
+
+    await simulator.close()
+
+    return {"iterations": iterations, **_percentiles(samples)}
+
+
+async def async_benchmark_throughput(iterations: int) -> dict[str, Any]:
+    """Measure the frames per second a bus handles when all devices are commanded at once."""
+    simulator = BusSimulator()
+    port = await simulator.start_tcp()
+
+    async with _async_home_assistant() as hass:
+        entry = await _async_setup_bus(
+            hass,
+            {"connection_type": "network", "host": "127.0.0.1", "port": port},
+            THROUGHPUT_DEVICES,
+        )
+        entity_ids = _entity_ids(hass)
+
+        received = simulator.frames_received
+        start = time.monotonic()
+        for iteration in range(iterations):
+            service = "close_cover" if iteration % 2 == 0 else "open_cover"
+            await asyncio.gather(
+                *(
+                    hass.services.async_call(
+                        "cover", service, {"entity_id": entity_id}, blocking=True
+                    )
+                    for entity_id in entity_ids
+                )
+            )
+
+        # Wait for the last frames to arrive.
+        while simulator.frames_received - received < iterations * len(entity_ids):
+            await simulator.wait_for_frame()
+        elapsed = time.monotonic() - start
+        frames = simulator.frames_received - received
+
+        await hass.config_entries.async_unload(entry.entry_id)
+
+    await simulator.close()
+
+    return {
+        "devices": len(entity_ids),
+        "frames": frames,
+        "seconds": round(elapsed, 3),
+        "frames_per_second": round(frames / elapsed, 1),
+    }
+
+
+async def async_benchmark_serial_test_blocking(iterations: int) -> dict[str, Any]:
+    """Measure how long the event loop is blocked while a serial port is tested."""
+    # pylint: disable=import-outside-toplevel
+    from custom_components.xyscreens import test_serial_port
+
+    simulator = BusSimulator()
+    path = simulator.start_pty()
+    loop = asyncio.get_running_loop()
+
+    # A task that should wake up every millisecond, any extra delay is time the loop was blocked.
+    lags = []
+    stop = asyncio.Event()
+
+    async def _async_ticker() -> None:
+        while not stop.is_set():
+            before = loop.time()
+            await asyncio.sleep(0.001)
+            lags.append(max(loop.time() - before - 0.001, 0.0))
+
+    ticker = asyncio.create_task(_async_ticker())
+
+    durations = []
+    for _ in range(iterations):
+        start = time.monotonic()
+        await test_serial_port(path)
+        durations.append(time.monotonic() - start)
+
+    stop.set()
+    await ticker
+    await simulator.close()
+
+    return {
+        "iterations": iterations,
+        "test_duration": _percentiles(durations),
+        "loop_lag": _percentiles(lags),
+    }
+
+
+async def async_benchmark_setup() -> dict[str, Any]:
+    """Measure the setup time of a bus with a growing number of devices."""
+    simulator = BusSimulator()
+    port = await simulator.start_tcp()
+
+    results = {}
+    for devices in SETUP_DEVICES:
+        async with _async_home_assistant() as hass:
+            start = time.monotonic()
+            entry = await _async_setup_bus(
+                hass,
+                {"connection_type": "network", "host": "127.0.0.1", "port": port},
+                devices,
+            )
+            elapsed = time.monotonic() - start
+            assert len(hass.states.async_all("cover")) == devices
+
+            await hass.config_entries.async_unload(entry.entry_id)
+
+        results[str(devices)] = {"setup_ms": round(elapsed * 1000, 3)}
+
+    await simulator.close()
+
+    return results
+
+
+def benchmark_import_time() -> dict[str, Any]:
+    """Measure the import time of the integration and its config flow, in a fresh interpreter."""
+    code = (
+        f"import {', '.join(PRELOADED_MODULES)}\n"
+        f"import {', '.join(IMPORTED_MODULES)}\n"
+    )
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    # Lines look like "import time:  self [us] | cumulative | package", the cumulative time of a
+    # module includes everything it imports that was not imported yet.
+    import_times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if name.strip() in IMPORTED_MODULES:
+            import_times[name.strip()] = round(int(cumulative) / 1000, 3)
+
+    return {"import_ms": import_times}
+
+
+async def _async_main(args: argparse.Namespace) -> dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "homeassistant": HA_VERSION,
+        "results": {
+            "import": benchmark_import_time(),
+            "latency": await async_benchmark_latency(args.iterations),
+            "throughput": await async_benchmark_throughput(args.iterations),
+            "serial_test_blocking": await async_benchmark_serial_test_blocking(
+                args.iterations
+            ),
+            "setup": await async_benchmark_setup(),
+        },
+    }
+
+
+def main() -> None:
+    """Run all benchmarks and write the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0])
+    parser.add_argument(
+        "--iterations", type=int, default=50, help="number of samples per benchmark"
+    )
+    parser.add_argument("--output", help="file to write the JSON results to")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    results = asyncio.run(_async_main(args))
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Replay a recording of the traffic on an RS-485 bus.
+
+The frames of a recording made with the Record the bus traffic option are written to the bus
+simulator again, at real or accelerated speed, and are fed through the cover and position tracking
+code of the integration the same way the frames of other controllers are. Afterwards the position
+the integration assumes for every device is compared with the position the simulator has emulated,
+which reproduces position drift caused by latency and timing offline.
+
+At an accelerated speed the durations of the devices are shortened by the same factor, the time a
+frame takes on the wire is not, which magnifies its effect on the positions.
+
+The time between recording sessions, and any silence longer than the longest move of a device, is
+shortened to that longest move. The devices have stopped by then, waiting longer changes nothing.
+
+Home Assistant runs in-process with the test helpers of pytest-homeassistant-custom-component,
+which has to be installed.
+
+Usage:
+    python scripts/replay.py xyscreens_dev_ttyusb0.rec [--speed 10] [--device aaeeee:10:12]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from typing import Any
+
+from benchmark import DOMAIN, _async_home_assistant, _percentiles
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from simulator import BusSimulator, SimulatedScreen, _parse_device
+
+# pylint: disable=wrong-import-order
+from custom_components.xyscreens.recorder import (
+    DIRECTION_RECEIVED,
+    DIRECTION_SENT,
+    DIRECTION_SESSION,
+    Record,
+    read_recording,
+)
+
+# Received frames equal to a frame sent this many nanoseconds before are echoes.
+ECHO_TIMEOUT = 1_000_000_000
+
+
+def _remove_echoes(records: list[Record]) -> list[Record]:
+    """Return the records without the echoes of the sent frames."""
+    result = []
+    sent: list[Record] = []
+    for record in records:
+        if record.direction == DIRECTION_SESSION:
+            # Frames sent before a restart are not echoed after it.
+            sent = []
+        elif record.direction == DIRECTION_SENT:
+            sent.append(record)
+        elif record.direction == DIRECTION_RECEIVED:
+            sent = [
+                frame
+                for frame in sent
+                if record.timestamp - frame.timestamp <= ECHO_TIMEOUT
+            ]
+            echo = next(
+                (
+                    frame
+                    for frame in sent
+                    if (frame.address, frame.opcode) == (record.address, record.opcode)
+                ),
+                None,
+            )
+            if echo is not None:
+                sent.remove(echo)
+                continue
+        result.append(record)
+    return result
+
+
+async def async_replay(
+    records: list[Record], screens: dict[bytes, SimulatedScreen], speed: float
+) -> dict[str, Any]:
+    """Replay the records and compare the assumed with the emulated positions."""
+    simulator = BusSimulator(list(screens.values()))
+    port = await simulator.start_tcp()
+
+    async with _async_home_assistant() as hass:
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            version=4,
+            minor_version=1,
+            unique_id=f"127.0.0.1:{port}",
+            title="Replay",
+            data={"connection_type": "network", "host": "127.0.0.1", "port": port},
+            subentries_data=[
+                {
+                    "data": {
+                        "address": screen.address.hex(),
+                        "device_type": "projector_screen",
+                        # The open time is the time the screen takes to go down.
+                        "time_open": screen.down_duration,
+                        "time_close": screen.up_duration,
+                        "inverted": False,
+                        "position_debounce": 0,
+                        "update_rate": 0,
+                    },
+                    "subentry_type": "device",
+                    "title": screen.address.hex().upper(),
+                    "unique_id": screen.address.hex(),
+                }
+                for screen in screens.values()
+            ],
+        )
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        bus = next(iter(hass.data[DOMAIN]["buses"].values()))
+        covers = {
+            cover.screen.address: cover for cover in hass.data[DOMAIN]["covers"].values()
+        }
+
+        longest_move = max(
+            max(screen.down_duration, screen.up_duration) for screen in screens.values()
+        )
+
+        # How much later than recorded every frame was written.
+        lateness = []
+        due = time.monotonic()
+        # The monotonic time of the previous frame in the same session.
+        previous = None
+        for record in records:
+            if record.direction == DIRECTION_SESSION:
+                previous = None
+                continue
+
+            if previous is None:
+                # The first frame of a session is replayed once the moves of the previous
+                # session have ended, the very first frame right away.
+                gap = longest_move if lateness else 0.0
+            else:
+                gap = (record.timestamp - previous) / 1e9 / speed
+            due += min(max(gap, 0.0), longest_move)
+            previous = record.timestamp
+
+            if (delay := due - time.monotonic()) > 0:
+                await asyncio.sleep(delay)
+            lateness.append(max(time.monotonic() - due, 0.0))
+
+            await bus.async_write_external(
+                b"\xff" + record.address + bytes((record.opcode,))
+            )
+
+        # Let the devices finish their moves.
+        await asyncio.sleep(longest_move)
+
+        positions = {}
+        for address, screen in screens.items():
+            assumed = covers[address].screen.position()
+            positions[address.hex()] = {
+                "assumed": round(assumed, 1),
+                "simulated": round(screen.position, 1),
+                "drift": round(assumed - screen.position, 1),
+            }
+
+        await hass.config_entries.async_unload(entry.entry_id)
+
+    await simulator.close()
+
+    return {
+        "frames": len(lateness),
+        "speed": speed,
+        "lateness": _percentiles(lateness) if lateness else None,
+        "positions": positions,
+    }
+
+
+def main() -> None:
+    """Replay a recording and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0])
+    parser.add_argument("recording", help="recording file to replay")
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="replay this many times faster"
+    )
+    parser.add_argument(
+        "--device",
+        action="append",
+        type=_parse_device,
+        default=[],
+        metavar="ADDRESS[:DOWN[:UP]]",
+        help="seconds the device at the address takes to go fully down and up",
+    )
+    parser.add_argument(
+        "--direction",
+        choices=("sent", "received", "all"),
+        default="all",
+        help="replay the frames sent by Home Assistant, received from others or both",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    records = _remove_echoes(read_recording(args.recording))
+    if args.direction == "sent":
+        records = [
+            record
+            for record in records
+            if record.direction in (DIRECTION_SENT, DIRECTION_SESSION)
+        ]
+    elif args.direction == "received":
+        records = [
+            record
+            for record in records
+            if record.direction in (DIRECTION_RECEIVED, DIRECTION_SESSION)
+        ]
+    if all(record.direction == DIRECTION_SESSION for record in records):
+        parser.error("the recording has no frames to replay")
+
+    # Every address in the recording gets a device, with the given or default durations.
+    screens = {screen.address: screen for screen in args.device}
+    for record in records:
+        if record.direction != DIRECTION_SESSION:
+            screens.setdefault(record.address, SimulatedScreen(record.address))
+    for screen in screens.values():
+        screen.down_duration /= args.speed
+        screen.up_duration /= args.speed
+
+    results = asyncio.run(async_replay(records, screens, args.speed))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+"""
+Simulator of an RS-485 bus with XY Screens devices.
+
+Offers the bus as a pseudo terminal, standing in for an RS485 USB adapter, and as a TCP server,
+standing in for an RS485-to-Ethernet converter. Frames are delivered at 2400 baud, decoded per
+device address and the travel of every screen is emulated. Latency, dropped frames and dropped
+connections can be injected to test the integration under bad conditions.
+
+Only the Python standard library is used, the simulator runs on Linux and macOS.
+
+Usage:
+    python scripts/simulator.py --pty --tcp 9997 --device aaeeee:10:12 --device eeeeee
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import collections
+import logging
+import os
+import random
+import time
+import tty
+from dataclasses import dataclass, field
+
+_LOGGER = logging.getLogger("simulator")
+
+# The devices communicate at 2400 baud 8N1, one start bit, eight data bits and one stop bit.
+BAUD_RATE = 2400
+BITS_PER_BYTE = 10
+
+FRAME_PREFIX = 0xFF
+FRAME_LENGTH = 5
+
+OPCODE_UP = 0xDD
+OPCODE_DOWN = 0xEE
+OPCODE_STOP = 0xCC
+
+# The number of received frames kept for inspection.
+HISTORY_SIZE = 10000
+
+
+@dataclass
+class SimulatedScreen:
+    """
+    A projector screen or lift emulating its travel.
+
+    The position is 0.0 when the screen is fully up and 100.0 when it is fully down, the same as
+    in the integration.
+    """
+
+    address: bytes
+    down_duration: float = 10.0
+    up_duration: float = 10.0
+
+    _position: float = 0.0
+    _direction: int = 0
+    _since: float = field(default_factory=time.monotonic)
+
+    @property
+    def position(self) -> float:
+        """Return the position the screen has reached by now."""
+        if self._direction == 0:
+            return self._position
+
+        duration = self.down_duration if self._direction > 0 else self.up_duration
+        travelled = (time.monotonic() - self._since) * 100.0 / duration
+        return min(max(self._position + self._direction * travelled, 0.0), 100.0)
+
+    @property
+    def state(self) -> str:
+        """Return the state of the screen."""
+        position = self.position
+        if self._direction > 0 and position < 100.0:
+            return "downward"
+        if self._direction < 0 and position > 0.0:
+            return "upward"
+        if position == 0.0:
+            return "up"
+        if position == 100.0:
+            return "down"
+        return "stopped"
+
+    def handle(self, opcode: int) -> None:
+        """Act on a command."""
+        self._position = self.position
+        self._since = time.monotonic()
+
+        if opcode == OPCODE_DOWN:
+            self._direction = 1
+        elif opcode == OPCODE_UP:
+            self._direction = -1
+        elif opcode == OPCODE_STOP:
+            self._direction = 0
+        else:
+            _LOGGER.info(
+                "Screen %s ignores opcode 0x%02x", self.address.hex(), opcode
+            )
+            return
+
+        _LOGGER.info(
+            "Screen %s is %s at %5.1f %%", self.address.hex(), self.state, self._position
+        )
+
+
+class BusSimulator:
+    """An RS-485 bus with simulated screens, reachable as pseudo terminal and TCP server."""
+
+    def __init__(
+        self,
+        screens: list[SimulatedScreen] | None = None,
+        latency: float = 0.0,
+        drop_rate: float = 0.0,
+        disconnect_rate: float = 0.0,
+    ) -> None:
+        """
+        Initialize the simulator.
+
+        Every received frame is delayed by latency seconds on top of its wire time, dropped with a
+        probability of drop_rate and closes the TCP connection with a probability of
+        disconnect_rate.
+        """
+        self.screens = {screen.address: screen for screen in screens or []}
+        self.latency = latency
+        self.drop_rate = drop_rate
+        self.disconnect_rate = disconnect_rate
+
+        # Received frames with the time.monotonic() time they were decoded.
+        self.history: collections.deque[tuple[float, bytes]] = collections.deque(
+            maxlen=HISTORY_SIZE
+        )
+        self.frames_received = 0
+        self.frames_dropped = 0
+        self.connections = 0
+        self.disconnects = 0
+
+        self._frame_waiters: list[asyncio.Future] = []
+        self._servers: list[asyncio.Server] = []
+        self._tcp_writers: set[asyncio.StreamWriter] = set()
+        self._pty_fds: list[int] = []
+        self._tasks: set[asyncio.Task] = set()
+        # The time the previous byte has been received, the bus delivers one byte at a time.
+        self._wire_free_at = 0.0
+
+    async def start_tcp(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Start the TCP server imitating a converter, return the port it listens on."""
+        server = await asyncio.start_server(self._handle_client, host, port)
+        self._servers.append(server)
+        port = server.sockets[0].getsockname()[1]
+        _LOGGER.info("Listening on %s:%d", host, port)
+        return port
+
+    def start_pty(self) -> str:
+        """Create the pseudo terminal imitating a serial port, return its path."""
+        master, slave = os.openpty()
+        tty.setraw(slave)
+        os.set_blocking(master, False)
+        self._pty_fds += [master, slave]
+
+        parser = self._frame_parser()
+        asyncio.get_running_loop().add_reader(master, self._read_pty, master, parser)
+
+        path = os.ttyname(slave)
+        _LOGGER.info("Serial port at %s", path)
+        return path
+
+    async def close(self) -> None:
+        """Stop the servers and close all connections."""
+        loop = asyncio.get_running_loop()
+
+        for server in self._servers:
+            server.close()
+        for writer in list(self._tcp_writers):
+            writer.close()
+        for server in self._servers:
+            await server.wait_closed()
+        self._servers.clear()
+
+        for fd in self._pty_fds:
+            loop.remove_reader(fd)
+            os.close(fd)
+        self._pty_fds.clear()
+
+        for task in list(self._tasks):
+            task.cancel()
+
+    async def wait_for_frame(self) -> tuple[float, bytes]:
+        """Wait for the next frame, return the time it was decoded and the frame."""
+        future = asyncio.get_running_loop().create_future()
+        self._frame_waiters.append(future)
+        return await future
+
+    def _frame_parser(self):
+        """Return a function feeding received bytes into a frame parser."""
+        buffer = bytearray()
+
+        def feed(data: bytes) -> list[bytes]:
+            buffer.extend(data)
+            frames = []
+            while True:
+                # Skip any garbage in front of the frame.
+                start = buffer.find(FRAME_PREFIX)
+                if start < 0:
+                    buffer.clear()
+                    break
+                del buffer[:start]
+                if len(buffer) < FRAME_LENGTH:
+                    break
+                frames.append(bytes(buffer[:FRAME_LENGTH]))
+                del buffer[:FRAME_LENGTH]
+            return frames
+
+        return feed
+
+    def _read_pty(self, fd: int, parser) -> None:
+        try:
+            data = os.read(fd, 1024)
+        except BlockingIOError:
+            return
+        except OSError:
+            # The other side of the pseudo terminal has no open file descriptors.
+            return
+        self._receive(data, parser, None)
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        self._tcp_writers.add(writer)
+        _LOGGER.info("Client %s connected", writer.get_extra_info("peername"))
+
+        parser = self._frame_parser()
+        try:
+            while data := await reader.read(1024):
+                self._receive(data, parser, writer)
+        except ConnectionError:
+            pass
+        finally:
+            self._tcp_writers.discard(writer)
+            writer.close()
+            _LOGGER.info("Client %s disconnected", writer.get_extra_info("peername"))
+
+    def _receive(
+        self, data: bytes, parser, writer: asyncio.StreamWriter | None
+    ) -> None:
+        """Deliver the bytes at the speed of the bus, plus the configured latency."""
+        loop = asyncio.get_running_loop()
+
+        now = loop.time()
+        self._wire_free_at = (
+            max(self._wire_free_at, now) + len(data) * BITS_PER_BYTE / BAUD_RATE
+        )
+        delay = self._wire_free_at - now + self.latency
+
+        frames = parser(data)
+        if not frames:
+            return
+
+        task = loop.create_task(self._deliver(frames, delay, writer))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _deliver(
+        self, frames: list[bytes], delay: float, writer: asyncio.StreamWriter | None
+    ) -> None:
+        await asyncio.sleep(delay)
+
+        for frame in frames:
+            self.frames_received += 1
+
+            if random.random() < self.drop_rate:
+                self.frames_dropped += 1
+                _LOGGER.info("Dropping frame 0x%s", frame.hex())
+                continue
+
+            received_at = time.monotonic()
+            self.history.append((received_at, frame))
+            for waiter in self._frame_waiters:
+                if not waiter.done():
+                    waiter.set_result((received_at, frame))
+            self._frame_waiters.clear()
+
+            if (screen := self.screens.get(frame[1:4])) is not None:
+                screen.handle(frame[4])
+            else:
+                _LOGGER.debug("No screen at address %s", frame[1:4].hex())
+
+            if writer is not None and random.random() < self.disconnect_rate:
+                self.disconnects += 1
+                _LOGGER.info("Dropping the connection")
+                writer.transport.abort()
+                return
+
+
+def _parse_device(value: str) -> SimulatedScreen:
+    """Parse an ADDRESS[:DOWN[:UP]] device argument."""
+    address, *durations = value.split(":")
+    screen = SimulatedScreen(bytes.fromhex(address))
+    if durations:
+        screen.down_duration = screen.up_duration = float(durations[0])
+    if len(durations) > 1:
+        screen.up_duration = float(durations[1])
+    return screen
+
+
+async def _async_main(args: argparse.Namespace) -> None:
+    simulator = BusSimulator(
+        args.device or [SimulatedScreen(b"\xaa\xee\xee")],
+        latency=args.latency,
+        drop_rate=args.drop_rate,
+        disconnect_rate=args.disconnect_rate,
+    )
+
+    if args.tcp is not None:
+        await simulator.start_tcp(args.host, args.tcp)
+    if args.pty:
+        print(simulator.start_pty(), flush=True)
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await simulator.close()
+
+
+def main() -> None:
+    """Run the simulator until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0])
+    parser.add_argument("--pty", action="store_true", help="offer a pseudo terminal")
+    parser.add_argument("--tcp", type=int, metavar="PORT", help="listen on a TCP port")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument(
+        "--device",
+        action="append",
+        type=_parse_device,
+        metavar="ADDRESS[:DOWN[:UP]]",
+        help="screen address with the seconds it takes to go fully down and up",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="extra seconds before a frame arrives"
+    )
+    parser.add_argument(
+        "--drop-rate", type=float, default=0.0, help="probability a frame is lost"
+    )
+    parser.add_argument(
+        "--disconnect-rate",
+        type=float,
+        default=0.0,
+        help="probability a frame makes the converter drop the TCP connection",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    if args.tcp is None and not args.pty:
+        parser.error("at least one of --pty and --tcp is required")
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(levelname)s %(message)s",
+    )
+
+    try:
+        asyncio.run(_async_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
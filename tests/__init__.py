@@ -0,0 +1,37 @@
+"""Tests of the XY Screens integration."""
+
+from typing import Any
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.xyscreens.const import DOMAIN
+
+
+def create_bus_entry(
+    host: str, port: int, addresses: tuple[str, ...] = ("aaeeee",), **device_data: Any
+) -> MockConfigEntry:
+    """Return an entry for a network bus with a device subentry for every address."""
+    return MockConfigEntry(
+        domain=DOMAIN,
+        version=4,
+        minor_version=1,
+        unique_id=f"{host}:{port}",
+        title=f"{host}:{port}",
+        data={"connection_type": "network", "host": host, "port": port},
+        subentries_data=[
+            {
+                "data": {
+                    "address": address,
+                    "device_type": "projector_screen",
+                    "time_open": 10,
+                    "time_close": 10,
+                    "inverted": False,
+                    **device_data,
+                },
+                "subentry_type": "device",
+                "title": address.upper(),
+                "unique_id": address,
+            }
+            for address in addresses
+        ],
+    )
@@ -0,0 +1,29 @@
+"""Fixtures of the XY Screens integration tests."""
+
+import os
+import sys
+
+import pytest
+
+# The tests of the scripts import them the way they import each other.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts"))
+
+# pylint: disable=wrong-import-position
+from simulator import BusSimulator
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations, socket_enabled):
+    """Load the integration of this repository and allow connections to the simulator."""
+    yield
+
+
+@pytest.fixture
+async def simulator():
+    """Return a bus simulator listening on TCP, with its port as attribute."""
+    simulator = BusSimulator()
+    simulator.port = await simulator.start_tcp()
+    yield simulator
+    await simulator.close()
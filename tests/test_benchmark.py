@@ -0,0 +1,109 @@
+"""Tests of the benchmarks."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from benchmark import (
+    SETUP_DEVICES,
+    THROUGHPUT_DEVICES,
+    _percentiles,
+    async_benchmark_latency,
+    async_benchmark_serial_test_blocking,
+    async_benchmark_setup,
+    async_benchmark_throughput,
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize(
+    "samples",
+    [
+        [0.005],
+        [0.020, 0.001],
+        [0.001, 0.002, 0.003, 0.100],
+        [0.010] * 19 + [0.500],
+        [index / 1000 for index in range(100, 0, -1)],
+    ],
+)
+def test_percentiles_in_order(samples: list[float]) -> None:
+    """The percentiles never decrease, whatever the number and order of the samples."""
+    result = _percentiles(samples)
+
+    assert (
+        result["min_ms"] <= result["p50_ms"] <= result["p95_ms"] <= result["max_ms"]
+    )
+
+
+def test_percentiles() -> None:
+    """The percentiles are interpolated between the samples."""
+    result = _percentiles([index / 1000 for index in range(1, 102)])
+
+    assert result == {"min_ms": 1.0, "p50_ms": 51.0, "p95_ms": 96.0, "max_ms": 101.0}
+
+
+async def test_latency() -> None:
+    """The latency is measured for every command sent to the simulator."""
+    result = await async_benchmark_latency(3)
+
+    assert result["iterations"] == 3
+    assert 0 < result["min_ms"] <= result["max_ms"]
+
+
+async def test_throughput() -> None:
+    """Every command to every device arrives on the simulator."""
+    result = await async_benchmark_throughput(2)
+
+    assert result["devices"] == THROUGHPUT_DEVICES
+    assert result["frames"] == 2 * THROUGHPUT_DEVICES
+    assert result["frames_per_second"] > 0
+
+
+async def test_serial_test_blocking() -> None:
+    """The serial port of the simulator is tested and the loop lag is measured meanwhile."""
+    result = await async_benchmark_serial_test_blocking(2)
+
+    assert result["iterations"] == 2
+    assert result["test_duration"]["min_ms"] > 0
+    assert result["loop_lag"]["min_ms"] >= 0
+
+
+async def test_setup() -> None:
+    """The setup is measured for every number of devices."""
+    result = await async_benchmark_setup()
+
+    assert list(result) == [str(devices) for devices in SETUP_DEVICES]
+    assert all(setup["setup_ms"] > 0 for setup in result.values())
+
+
+def test_script(tmp_path: Path) -> None:
+    """The script runs outside pytest and writes the results as JSON."""
+    output = tmp_path / "results.json"
+
+    subprocess.run(
+        [
+            sys.executable,
+            os.path.join(ROOT, "scripts", "benchmark.py"),
+            "--iterations",
+            "2",
+            "--output",
+            str(output),
+        ],
+        cwd=ROOT,
+        capture_output=True,
+        check=True,
+    )
+
+    results = json.loads(output.read_text(encoding="utf-8"))
+    assert set(results["results"]) == {
+        "import",
+        "latency",
+        "throughput",
+        "serial_test_blocking",
+        "setup",
+    }
+    assert results["results"]["latency"]["iterations"] == 2
@@ -0,0 +1,99 @@
+"""Tests of the shared RS-485 bus."""
+
+import asyncio
+
+import pytest
+from homeassistant.exceptions import HomeAssistantError
+from simulator import BusSimulator
+
+from custom_components.xyscreens.bus import (
+    COMMAND_QUEUE_SIZE,
+    XYScreensBus,
+    transmit_time,
+)
+from custom_components.xyscreens.frames import get_frames
+
+FRAMES = get_frames("aaeeee")
+OTHER_FRAMES = get_frames("eeeeee")
+
+
+@pytest.fixture
+async def bus(simulator: BusSimulator):
+    """Return a bus connected to the simulator."""
+    bus = XYScreensBus(
+        {"connection_type": "network", "host": "127.0.0.1", "port": simulator.port}
+    )
+    await bus.async_open()
+    yield bus
+    await bus.async_close()
+
+
+async def _async_frames(simulator: BusSimulator, count: int) -> list[bytes]:
+    """Wait until the simulator has received count frames, return them."""
+    while len(simulator.history) < count:
+        await asyncio.wait_for(simulator.wait_for_frame(), 1.0)
+    # Nothing else arrives.
+    await asyncio.sleep(0.1)
+    return [frame for _, frame in simulator.history]
+
+
+async def test_latest_frame_wins(bus: XYScreensBus, simulator: BusSimulator) -> None:
+    """Frames for the same address queued in one tick are replaced by the newest one."""
+    results = await asyncio.gather(
+        bus.async_write(FRAMES.up),
+        bus.async_write(FRAMES.stop),
+        bus.async_write(FRAMES.down),
+    )
+
+    assert results[0] is None
+    assert results[1] is None
+    assert isinstance(results[2], float)
+    assert await _async_frames(simulator, 1) == [FRAMES.down]
+    assert bus.frames_sent == 1
+
+
+async def test_other_addresses_not_replaced(
+    bus: XYScreensBus, simulator: BusSimulator
+) -> None:
+    """A frame only replaces a queued frame for the same address."""
+    results = await asyncio.gather(
+        bus.async_write(FRAMES.up),
+        bus.async_write(OTHER_FRAMES.down),
+        bus.async_write(FRAMES.stop),
+    )
+
+    assert results[0] is None
+    assert None not in results[1:]
+    assert sorted(await _async_frames(simulator, 2)) == sorted(
+        [OTHER_FRAMES.down, FRAMES.stop]
+    )
+
+
+async def test_wire_time_spacing(bus: XYScreensBus, simulator: BusSimulator) -> None:
+    """A frame is only written once the previous frame has left the wire."""
+    first, second = await asyncio.gather(
+        bus.async_write(FRAMES.down), bus.async_write(OTHER_FRAMES.down)
+    )
+
+    assert second - first >= transmit_time(FRAMES.down)
+    await _async_frames(simulator, 2)
+
+
+async def test_queue_full(bus: XYScreensBus, simulator: BusSimulator) -> None:
+    """Commands for more addresses than the queue holds are refused."""
+    frames = [get_frames(f"aa{index:04x}").stop for index in range(COMMAND_QUEUE_SIZE)]
+    # The writes are all queued before the writer task gets to run.
+    results = await asyncio.gather(
+        *(bus.async_write(frame) for frame in frames),
+        bus.async_write(OTHER_FRAMES.stop),
+        # Replacing a queued frame is still possible.
+        bus.async_write(get_frames("aa0000").down),
+        return_exceptions=True,
+    )
+
+    assert results[0] is None
+    assert all(isinstance(result, float) for result in results[1:COMMAND_QUEUE_SIZE])
+    assert isinstance(results[COMMAND_QUEUE_SIZE], HomeAssistantError)
+    assert isinstance(results[-1], float)
+    assert bus.queue_high_water == COMMAND_QUEUE_SIZE
+    assert len(await _async_frames(simulator, COMMAND_QUEUE_SIZE)) == COMMAND_QUEUE_SIZE
@@ -0,0 +1,269 @@
+"""Tests of the config flow of the XY Screens integration."""
+
+import socket
+
+import pytest
+from homeassistant.config_entries import SOURCE_RECONFIGURE, SOURCE_USER
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.xyscreens.const import DOMAIN
+
+from . import create_bus_entry
+
+HOST = "127.0.0.1"
+
+DEVICE_INPUT = {
+    "address": "AAEEEE",
+    "device_type": "projector_screen",
+    "time_open": 12,
+    "time_close": 14,
+    "inverted": False,
+}
+
+
+def _unused_port() -> int:
+    """Return a port nothing listens on, so connections to it are refused."""
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+async def _async_start_flow(hass: HomeAssistant, connection_type: str) -> str:
+    """Start a flow and select the connection type, return the flow id."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": SOURCE_USER}
+    )
+    assert result["type"] is FlowResultType.FORM
+    assert result["step_id"] == "connection_type"
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"connection_type": connection_type}
+    )
+    assert result["type"] is FlowResultType.FORM
+    assert result["step_id"] == "setup_connection"
+
+    return result["flow_id"]
+
+
+async def test_setup_network(hass: HomeAssistant, simulator) -> None:
+    """A network bus is created with its first device."""
+    flow_id = await _async_start_flow(hass, "network")
+
+    result = await hass.config_entries.flow.async_configure(
+        flow_id,
+        {
+            "connection_type": "network",
+            "host": HOST,
+            "port": simulator.port,
+            **DEVICE_INPUT,
+        },
+    )
+    await hass.async_block_till_done()
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    entry = result["result"]
+    assert entry.unique_id == f"{HOST}:{simulator.port}"
+    assert dict(entry.data) == {
+        "connection_type": "network",
+        "host": HOST,
+        "port": simulator.port,
+    }
+    assert [dict(subentry.data) for subentry in entry.subentries.values()] == [
+        {**DEVICE_INPUT, "address": "aaeeee"}
+    ]
+    assert hass.states.get("cover.projector_screen") is not None
+
+
+async def test_setup_serial(hass: HomeAssistant, simulator) -> None:
+    """A serial bus is created with its first device."""
+    serial_port = simulator.start_pty()
+    flow_id = await _async_start_flow(hass, "serial")
+
+    result = await hass.config_entries.flow.async_configure(
+        flow_id,
+        {"connection_type": "serial", "serial_port": serial_port, **DEVICE_INPUT},
+    )
+    await hass.async_block_till_done()
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert result["result"].unique_id == serial_port
+    assert dict(result["result"].data) == {
+        "connection_type": "serial",
+        "serial_port": serial_port,
+    }
+
+
+async def test_setup_already_configured(hass: HomeAssistant, simulator) -> None:
+    """A bus that is already configured is not added again."""
+    create_bus_entry(HOST, simulator.port).add_to_hass(hass)
+    flow_id = await _async_start_flow(hass, "network")
+
+    result = await hass.config_entries.flow.async_configure(
+        flow_id,
+        {
+            "connection_type": "network",
+            "host": HOST,
+            "port": simulator.port,
+            **DEVICE_INPUT,
+            "address": "EEEEEE",
+        },
+    )
+
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "already_configured"
+
+
+async def test_setup_serial_already_configured(hass: HomeAssistant, simulator) -> None:
+    """A serial port that is already configured is not added again."""
+    serial_port = simulator.start_pty()
+    MockConfigEntry(
+        domain=DOMAIN,
+        version=4,
+        minor_version=1,
+        unique_id=serial_port,
+        data={"connection_type": "serial", "serial_port": serial_port},
+    ).add_to_hass(hass)
+    flow_id = await _async_start_flow(hass, "serial")
+
+    result = await hass.config_entries.flow.async_configure(
+        flow_id,
+        {"connection_type": "serial", "serial_port": serial_port, **DEVICE_INPUT},
+    )
+
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "already_configured"
+
+
+async def test_setup_errors(hass: HomeAssistant) -> None:
+    """Invalid input is reported before the connection is tested."""
+    flow_id = await _async_start_flow(hass, "network")
+
+    result = await hass.config_entries.flow.async_configure(
+        flow_id,
+        {
+            "connection_type": "network",
+            "host": HOST,
+            "port": _unused_port(),
+            **DEVICE_INPUT,
+            "address": "AAEE",
+        },
+    )
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {"address": "invalid_address"}
+
+    result = await hass.config_entries.flow.async_configure(
+        flow_id,
+        {
+            "connection_type": "network",
+            "host": HOST,
+            "port": _unused_port(),
+            **DEVICE_INPUT,
+        },
+    )
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {"base": "cannot_connect"}
+
+
+@pytest.mark.parametrize("host", ["foo..bar", f"{'a' * 64}.example"])
+async def test_setup_invalid_host(hass: HomeAssistant, host: str) -> None:
+    """A host name with an empty or too long label can't be connected to."""
+    flow_id = await _async_start_flow(hass, "network")
+
+    result = await hass.config_entries.flow.async_configure(
+        flow_id,
+        {"connection_type": "network", "host": host, "port": 9997, **DEVICE_INPUT},
+    )
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {"base": "cannot_connect"}
+
+
+async def test_add_device(hass: HomeAssistant, simulator) -> None:
+    """A device is added to the bus, an address can only be added once."""
+    entry = create_bus_entry(HOST, simulator.port)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    result = await hass.config_entries.subentries.async_init(
+        (entry.entry_id, "device"), context={"source": SOURCE_USER}
+    )
+    assert result["type"] is FlowResultType.FORM
+    assert result["step_id"] == "user"
+
+    result = await hass.config_entries.subentries.async_configure(
+        result["flow_id"], {**DEVICE_INPUT, "address": "EEEEEE"}
+    )
+    await hass.async_block_till_done()
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert {subentry.unique_id for subentry in entry.subentries.values()} == {
+        "aaeeee",
+        "eeeeee",
+    }
+    # The new device is added without reloading the entry.
+    assert len(hass.data[DOMAIN]["covers"]) == 2
+
+    result = await hass.config_entries.subentries.async_init(
+        (entry.entry_id, "device"), context={"source": SOURCE_USER}
+    )
+    result = await hass.config_entries.subentries.async_configure(
+        result["flow_id"], {**DEVICE_INPUT, "address": "eeeeee"}
+    )
+
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "already_configured"
+
+
+async def test_add_device_invalid_address(hass: HomeAssistant, simulator) -> None:
+    """An invalid address is reported."""
+    entry = create_bus_entry(HOST, simulator.port)
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.subentries.async_init(
+        (entry.entry_id, "device"), context={"source": SOURCE_USER}
+    )
+    result = await hass.config_entries.subentries.async_configure(
+        result["flow_id"], {**DEVICE_INPUT, "address": "xyz"}
+    )
+
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {"address": "invalid_address"}
+
+
+async def test_reconfigure_device(hass: HomeAssistant, simulator) -> None:
+    """The settings of a device are changed without reloading the entry."""
+    entry = create_bus_entry(HOST, simulator.port)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    subentry_id = next(iter(entry.subentries))
+    cover = hass.data[DOMAIN]["covers"]["cover.projector_screen"]
+
+    result = await hass.config_entries.subentries.async_init(
+        (entry.entry_id, "device"),
+        context={"source": SOURCE_RECONFIGURE, "subentry_id": subentry_id},
+    )
+    assert result["type"] is FlowResultType.FORM
+    assert result["step_id"] == "projector_screen"
+
+    result = await hass.config_entries.subentries.async_configure(
+        result["flow_id"],
+        {
+            "time_open": 20,
+            "time_close": 22,
+            "inverted": True,
+            "position_debounce": 0.5,
+            "update_rate": 4,
+        },
+    )
+    await hass.async_block_till_done()
+
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "reconfigure_successful"
+    data = entry.subentries[subentry_id].data
+    assert (data["address"], data["time_open"], data["inverted"]) == ("aaeeee", 20, True)
+    # The running cover has the new settings.
+    assert hass.data[DOMAIN]["covers"]["cover.projector_screen"] is cover
+    assert cover.screen_position(0) == 0
@@ -0,0 +1,78 @@
+"""Tests of the XY Screens cover entity."""
+
+import asyncio
+
+from homeassistant.core import HomeAssistant
+
+from . import create_bus_entry
+
+ENTITY_ID = "cover.projector_screen"
+
+
+async def _async_setup(hass: HomeAssistant, simulator, **device_data) -> None:
+    entry = create_bus_entry("127.0.0.1", simulator.port, **device_data)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def _async_set_position(hass: HomeAssistant, position: int) -> None:
+    await hass.services.async_call(
+        "cover",
+        "set_cover_position",
+        {"entity_id": ENTITY_ID, "position": position},
+        blocking=True,
+    )
+
+
+async def test_drag_retargets(hass: HomeAssistant, simulator) -> None:
+    """Positions in the direction of the move in progress retarget it right away."""
+    await _async_setup(
+        hass, simulator, time_open=2, time_close=2, position_debounce=0.5
+    )
+
+    # Dragging the slider down, every position is reached after the next one is set.
+    for position in range(95, 74, -5):
+        await _async_set_position(hass, position)
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(1.0)
+
+    assert [frame[4] for _, frame in simulator.history] == [0xEE, 0xCC]
+    assert hass.states.get(ENTITY_ID).attributes["current_position"] == 75
+
+
+async def test_reverse_debounced(hass: HomeAssistant, simulator) -> None:
+    """A position against the direction of the move in progress waits for the window."""
+    await _async_setup(
+        hass, simulator, time_open=2, time_close=2, position_debounce=0.5
+    )
+
+    await _async_set_position(hass, 40)
+    await asyncio.sleep(0.05)
+    await _async_set_position(hass, 100)
+    await asyncio.sleep(0.2)
+
+    # The move down is still going, the move back up starts when the window expires.
+    assert [frame[4] for _, frame in simulator.history] == [0xEE]
+    await asyncio.sleep(1.0)
+    assert [frame[4] for _, frame in simulator.history][:2] == [0xEE, 0xDD]
+
+
+async def test_update_rate(hass: HomeAssistant, simulator) -> None:
+    """The state of a moving cover is written at update rates above the default progress rate."""
+    await _async_setup(hass, simulator, time_open=2, time_close=2, update_rate=10)
+
+    positions = []
+    hass.bus.async_listen(
+        "state_changed",
+        lambda event: positions.append(
+            event.data["new_state"].attributes.get("current_position")
+        ),
+    )
+
+    await _async_set_position(hass, 50)
+    await asyncio.sleep(1.2)
+
+    # A move of one second, written at the start, about every 0.1 seconds and at the end.
+    assert positions[-1] == 50
+    assert len(set(positions)) >= 8
@@ -0,0 +1,48 @@
+"""Tests of the diagnostics of the XY Screens integration."""
+
+import asyncio
+import json
+import socket
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.xyscreens.const import DOMAIN
+from custom_components.xyscreens.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+
+from . import create_bus_entry
+
+HOST = "127.0.0.1"
+
+
+def _unused_port() -> int:
+    """Return a port nothing listens on, so connections to it are refused."""
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+async def test_connection_refused(hass: HomeAssistant) -> None:
+    """The address of a converter that refuses the connection is not in the diagnostics."""
+    port = _unused_port()
+    entry = create_bus_entry(HOST, port)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    bus = next(iter(hass.data[DOMAIN]["buses"].values()))
+    for _ in range(100):
+        if bus.last_error is not None:
+            break
+        await asyncio.sleep(0.01)
+    assert HOST in bus.last_error
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diagnostics["entry"]["data"]["host"] == "**REDACTED**"
+    assert diagnostics["bus"]["connect_failures"] >= 1
+    assert "**REDACTED**" in diagnostics["bus"]["last_error"]
+    assert HOST not in json.dumps(diagnostics)
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,39 @@
+"""Tests of the frames of the XY Screens devices."""
+
+import pytest
+
+from custom_components.xyscreens.frames import XYScreensFrameParser, get_frames
+
+FRAMES = get_frames("aaeeee")
+
+
+def test_parse_frames() -> None:
+    """Frames are parsed from any chunks of the byte stream, noise before them is skipped."""
+    parser = XYScreensFrameParser()
+
+    assert parser.feed(b"\x00\x12" + FRAMES.down + FRAMES.up[:2]) == [FRAMES.down]
+    assert parser.feed(FRAMES.up[2:4]) == []
+    assert parser.feed(FRAMES.up[4:] + FRAMES.stop) == [FRAMES.up, FRAMES.stop]
+
+
+@pytest.mark.parametrize("length", [1, 2, 3, 4])
+def test_truncated_frame(length: int) -> None:
+    """A truncated frame is dropped and the valid frame after it is parsed."""
+    parser = XYScreensFrameParser()
+
+    assert parser.feed(FRAMES.down[:length] + FRAMES.stop) == [FRAMES.stop]
+
+
+def test_truncated_frame_split() -> None:
+    """A truncated frame at the end of one chunk does not swallow the frame in the next."""
+    parser = XYScreensFrameParser()
+
+    assert parser.feed(FRAMES.down[:3]) == []
+    assert parser.feed(FRAMES.stop) == [FRAMES.stop]
+
+
+def test_unknown_opcode() -> None:
+    """A frame with an unknown opcode is dropped and the parser resynchronises."""
+    parser = XYScreensFrameParser()
+
+    assert parser.feed(b"\xff\xaa\xee\xee\x12\x34" + FRAMES.up) == [FRAMES.up]
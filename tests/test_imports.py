@@ -0,0 +1,55 @@
+"""Tests of the modules the integration imports."""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only needed once a serial bus is set up.
+SERIAL_MODULES = {"serial", "serial_asyncio_fast"}
+
+
+def _imported_packages(code: str) -> set[str]:
+    """Run the code in a fresh interpreter and return the top level packages it imported."""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        stderr=subprocess.PIPE,
+        check=True,
+        text=True,
+    )
+
+    # Lines look like "import time:  self [us] | cumulative | package".
+    return {
+        line.rsplit("|", 1)[1].strip().split(".")[0]
+        for line in process.stderr.splitlines()
+        if line.startswith("import time:") and "|" in line
+    }
+
+
+def test_import() -> None:
+    """Importing the integration and its config flow doesn't import the serial stack."""
+    imported = _imported_packages(
+        "import custom_components.xyscreens, custom_components.xyscreens.config_flow"
+    )
+
+    assert "custom_components" in imported
+    assert not imported & SERIAL_MODULES
+
+
+def test_network_setup() -> None:
+    """Setting up a network bus and moving its cover doesn't import the serial stack."""
+    # The latency benchmark sets up a network bus with one cover and moves it. The benchmark
+    # imports the integration before Home Assistant starts, the test helpers would hide it
+    # otherwise.
+    imported = _imported_packages(
+        "import asyncio, sys\n"
+        "sys.path.insert(0, 'scripts')\n"
+        "import custom_components.xyscreens\n"
+        "from benchmark import async_benchmark_latency\n"
+        "asyncio.run(async_benchmark_latency(1))\n"
+    )
+
+    assert "homeassistant" in imported
+    assert not imported & SERIAL_MODULES
@@ -0,0 +1,66 @@
+"""Tests of the setup of the XY Screens integration."""
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.xyscreens.const import DOMAIN
+
+
+def _create_serial_entry(serial_port: str) -> MockConfigEntry:
+    return MockConfigEntry(
+        domain=DOMAIN,
+        version=4,
+        minor_version=1,
+        unique_id=serial_port,
+        title=serial_port,
+        data={"connection_type": "serial", "serial_port": serial_port},
+        subentries_data=[
+            {
+                "data": {
+                    "address": "aaeeee",
+                    "device_type": "projector_screen",
+                    "time_open": 10,
+                    "time_close": 10,
+                    "inverted": False,
+                },
+                "subentry_type": "device",
+                "title": "AAEEEE",
+                "unique_id": "aaeeee",
+            }
+        ],
+    )
+
+
+async def test_setup_serial(hass: HomeAssistant, simulator) -> None:
+    """A serial bus is opened once by the setup and stays open."""
+    entry = _create_serial_entry(simulator.start_pty())
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert entry.state is ConfigEntryState.LOADED
+    bus = hass.data[DOMAIN]["buses"][entry.data["serial_port"]]
+    assert bus.connected
+    assert bus.connects == 1
+
+    await hass.services.async_call(
+        "cover", "close_cover", {"entity_id": "cover.projector_screen"}, blocking=True
+    )
+    assert bus.connects == 1
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    assert not bus.connected
+
+
+async def test_setup_serial_missing(hass: HomeAssistant) -> None:
+    """The setup is retried when the serial port can't be opened."""
+    entry = _create_serial_entry("/dev/does-not-exist")
+    entry.add_to_hass(hass)
+
+    assert not await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert entry.state is ConfigEntryState.SETUP_RETRY
+    assert not hass.data[DOMAIN].get("buses")
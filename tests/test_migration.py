@@ -0,0 +1,177 @@
+"""Tests of the migration of single device entries to bus entries."""
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.xyscreens.const import DOMAIN
+
+
+def _add_device_entry(
+    hass: HomeAssistant,
+    version: int,
+    minor_version: int,
+    unique_id: str,
+    data: dict,
+    options: dict,
+) -> tuple[MockConfigEntry, str]:
+    """Add a single device entry with its device and cover entity, return the entity id."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=version,
+        minor_version=minor_version,
+        unique_id=unique_id,
+        title=unique_id,
+        data=data,
+        options=options,
+    )
+    entry.add_to_hass(hass)
+
+    device = dr.async_get(hass).async_get_or_create(
+        config_entry_id=entry.entry_id,
+        identifiers={(DOMAIN, entry.entry_id)},
+        name=unique_id,
+    )
+    entity = er.async_get(hass).async_get_or_create(
+        "cover",
+        DOMAIN,
+        entry.entry_id,
+        config_entry=entry,
+        device_id=device.id,
+        suggested_object_id=unique_id.replace(":", "_").replace("-", "_"),
+    )
+    return entry, entity.entity_id
+
+
+def _assert_migrated(hass: HomeAssistant, entity_ids: dict[str, str]) -> MockConfigEntry:
+    """Assert there is one bus entry with the devices and entities of the old entries."""
+    entries = hass.config_entries.async_entries(DOMAIN)
+    assert len(entries) == 1
+    entry = entries[0]
+    assert (entry.version, entry.minor_version) == (4, 1)
+
+    subentries = {
+        subentry.unique_id: subentry for subentry in entry.subentries.values()
+    }
+    assert set(subentries) == set(entity_ids)
+
+    ent_reg = er.async_get(hass)
+    dev_reg = dr.async_get(hass)
+    for address, entity_id in entity_ids.items():
+        subentry = subentries[address]
+        entity = ent_reg.async_get(entity_id)
+        assert entity.config_entry_id == entry.entry_id
+        assert entity.config_subentry_id == subentry.subentry_id
+        assert entity.unique_id == subentry.subentry_id
+
+        device = dev_reg.async_get(entity.device_id)
+        assert device.identifiers == {(DOMAIN, subentry.subentry_id)}
+        assert device.config_entries == {entry.entry_id}
+        assert hass.states.get(entity_id) is not None
+
+    return entry
+
+
+async def test_migrate_serial(hass: HomeAssistant, simulator) -> None:
+    """Entries 2.1 and 2.2 on one serial port become one bus entry, duplicates are dropped."""
+    serial_port = simulator.start_pty()
+
+    _, first = _add_device_entry(
+        hass,
+        2,
+        1,
+        serial_port,
+        {"serial_port": serial_port},
+        {"time_open": 20, "time_close": 25},
+    )
+    _, second = _add_device_entry(
+        hass,
+        2,
+        2,
+        f"{serial_port}-eeeeee",
+        {
+            "serial_port": serial_port,
+            "address": "eeeeee",
+            "device_type": "projector_lift",
+        },
+        {"time_open": 5, "time_close": 6, "inverted": True},
+    )
+    # The same address as the 2.1 entry, after it is migrated to 2.2.
+    _, duplicate = _add_device_entry(
+        hass,
+        2,
+        2,
+        f"{serial_port}-aaeeee-2",
+        {
+            "serial_port": serial_port,
+            "address": "aaeeee",
+            "device_type": "projector_screen",
+        },
+        {"time_open": 30, "time_close": 30, "inverted": False},
+    )
+
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+
+    entry = _assert_migrated(hass, {"aaeeee": first, "eeeeee": second})
+    assert entry.unique_id == serial_port
+    assert dict(entry.data) == {"serial_port": serial_port}
+
+    devices = {
+        subentry.unique_id: dict(subentry.data) for subentry in entry.subentries.values()
+    }
+    assert devices == {
+        "aaeeee": {
+            "address": "aaeeee",
+            "device_type": "projector_screen",
+            "time_open": 20,
+            "time_close": 25,
+            "inverted": False,
+        },
+        "eeeeee": {
+            "address": "eeeeee",
+            "device_type": "projector_lift",
+            "time_open": 5,
+            "time_close": 6,
+            "inverted": True,
+        },
+    }
+
+    # The entity of the duplicate is removed with its entry.
+    assert er.async_get(hass).async_get(duplicate) is None
+
+
+async def test_migrate_network(hass: HomeAssistant, simulator) -> None:
+    """Entries 2.2 on one converter become one bus entry."""
+    host = f"127.0.0.1:{simulator.port}"
+    entity_ids = {}
+    for address in ("aaeeee", "eeeeee", "aa0001"):
+        _, entity_ids[address] = _add_device_entry(
+            hass,
+            2,
+            2,
+            f"{host}-{address}",
+            {
+                "connection_type": "network",
+                "host": "127.0.0.1",
+                "port": simulator.port,
+                "address": address,
+                "device_type": "projector_screen",
+            },
+            {"time_open": 10, "time_close": 10, "inverted": False},
+        )
+
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+
+    entry = _assert_migrated(hass, entity_ids)
+    assert entry.unique_id == host
+    assert entry.title == host
+    assert dict(entry.data) == {
+        "connection_type": "network",
+        "host": "127.0.0.1",
+        "port": simulator.port,
+    }
+    assert len(hass.data[DOMAIN]["buses"]) == 1
@@ -0,0 +1,58 @@
+"""Tests of the recorder of the bus traffic."""
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.xyscreens.frames import get_frames
+from custom_components.xyscreens.recorder import (
+    DIRECTION_RECEIVED,
+    DIRECTION_SENT,
+    DIRECTION_SESSION,
+    HEADER,
+    RECORD,
+    XYScreensRecorder,
+    read_recording,
+)
+
+FRAMES = get_frames("aaeeee")
+
+
+async def test_sessions(hass: HomeAssistant, tmp_path) -> None:
+    """Every recorder starts a new session in the file it continues."""
+    path = str(tmp_path / "xyscreens.rec")
+
+    recorder = XYScreensRecorder(path)
+    recorder.record(DIRECTION_SENT, FRAMES.down + FRAMES.stop)
+    await recorder.async_start(hass)
+    await recorder.async_stop(hass)
+
+    recorder = XYScreensRecorder(path)
+    await recorder.async_start(hass)
+    recorder.record(DIRECTION_RECEIVED, FRAMES.up)
+    await recorder.async_stop(hass)
+
+    records = read_recording(path)
+
+    assert [record.sequence for record in records] == [1, 2, 3, 4, 5]
+    assert [(record.direction, record.opcode) for record in records] == [
+        (DIRECTION_SESSION, 0),
+        (DIRECTION_SENT, 0xEE),
+        (DIRECTION_SENT, 0xCC),
+        (DIRECTION_SESSION, 0),
+        (DIRECTION_RECEIVED, 0xDD),
+    ]
+    # The session markers have the wall clock time.
+    assert records[3].timestamp >= records[0].timestamp > 10**18
+
+
+async def test_ring(hass: HomeAssistant, tmp_path) -> None:
+    """The oldest records are overwritten when the file is full."""
+    path = str(tmp_path / "xyscreens.rec")
+
+    recorder = XYScreensRecorder(path, max_size=HEADER.size + 4 * RECORD.size)
+    await recorder.async_start(hass)
+    recorder.record(DIRECTION_SENT, FRAMES.down + FRAMES.stop + FRAMES.up + FRAMES.stop)
+    await recorder.async_stop(hass)
+
+    records = read_recording(path)
+
+    assert [record.sequence for record in records] == [2, 3, 4, 5]
@@ -0,0 +1,62 @@
+"""Tests of replaying a recording of the bus traffic."""
+
+from replay import async_replay
+from simulator import SimulatedScreen
+
+from custom_components.xyscreens.recorder import (
+    DIRECTION_RECEIVED,
+    DIRECTION_SESSION,
+    Record,
+)
+
+ADDRESS = bytes.fromhex("aaeeee")
+
+
+def _record(sequence: int, seconds: float, opcode: int) -> Record:
+    return Record(sequence, int(seconds * 1e9), DIRECTION_RECEIVED, ADDRESS, opcode)
+
+
+async def test_replay_asymmetric_durations() -> None:
+    """A device that goes down faster than up is replayed without drift."""
+    # Down for half the down duration, up for a quarter of the up duration.
+    records = [
+        _record(1, 0.0, 0xEE),
+        _record(2, 0.5, 0xCC),
+        _record(3, 1.0, 0xDD),
+        _record(4, 1.5, 0xCC),
+    ]
+    screens = {ADDRESS: SimulatedScreen(ADDRESS, down_duration=1.0, up_duration=2.0)}
+
+    results = await async_replay(records, screens, 1.0)
+
+    position = results["positions"][ADDRESS.hex()]
+    assert abs(position["simulated"] - 25.0) < 5.0
+    assert abs(position["drift"]) < 3.0
+
+
+def _session(sequence: int) -> Record:
+    return Record(sequence, 0, DIRECTION_SESSION, bytes(3), 0)
+
+
+async def test_replay_sessions() -> None:
+    """The monotonic time restarts in a new session, and silences are shortened."""
+    records = [
+        _session(1),
+        _record(2, 1000.0, 0xEE),
+        _record(3, 1000.5, 0xCC),
+        # Home Assistant restarted after a reboot, the monotonic clock went back.
+        _session(4),
+        _record(5, 5.0, 0xDD),
+        _record(6, 5.5, 0xCC),
+        # An hour later.
+        _record(7, 3605.5, 0xEE),
+        _record(8, 3605.75, 0xCC),
+    ]
+    screens = {ADDRESS: SimulatedScreen(ADDRESS, down_duration=1.0, up_duration=2.0)}
+
+    results = await async_replay(records, screens, 1.0)
+
+    assert results["frames"] == 6
+    position = results["positions"][ADDRESS.hex()]
+    assert abs(position["simulated"] - 50.0) < 5.0
+    assert abs(position["drift"]) < 3.0